@@ -11,8 +11,12 @@ professional medical advice. Always consult with a healthcare provider before
 combining supplements and medications.
 """
 
+import re
 import sys
-from typing import List, Dict, Set, Optional
+import cmd
+import functools
+from collections import defaultdict
+from typing import List, Dict, Set, Optional, Tuple, Pattern
 from dataclasses import dataclass
 from enum import Enum
 
@@ -25,7 +29,23 @@ class InteractionSeverity(Enum):
     SEVERE = "severe"  # Life-threatening interactions requiring immediate medical attention
 
 
-@dataclass
+# Use slotted dataclasses where supported (Python 3.10+) to shrink records
+_DATACLASS_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+# Severity rank for sorting (minor to severe)
+_SEVERITY_RANK = {
+    InteractionSeverity.MINOR: 0,
+    InteractionSeverity.MODERATE: 1,
+    InteractionSeverity.MAJOR: 2,
+    InteractionSeverity.SEVERE: 3
+}
+
+# Severities that trigger the critical warning in the session summary
+_CRITICAL_SEVERITIES = frozenset({InteractionSeverity.MAJOR, InteractionSeverity.SEVERE})
+
+
+@dataclass(**_DATACLASS_OPTIONS)
 class Substance:
     """Represents a substance (herb, supplement, or medication)"""
     name: str
@@ -35,7 +55,7 @@ class Substance:
     description: str
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class Interaction:
     """Represents an interaction between substances"""
     substance1: str
@@ -46,265 +66,392 @@ class Interaction:
     recommendation: str
 
 
+# Built-in substances: (name, category, common_names, primary_effects, description)
+_SUBSTANCE_DATA = (
+    # Common herbal supplements
+    (
+        "St. John's Wort", "herb",
+        ("st johns wort", "hypericum", "hypericum perforatum"),
+        ("mood elevation", "antidepressant"),
+        "Popular herbal supplement used for mild to moderate depression"
+    ),
+    (
+        "Valerian Root", "herb",
+        ("valerian", "valerian root"),
+        ("relaxation", "sedation", "sleep aid"),
+        "Herbal supplement commonly used for relaxation and sleep"
+    ),
+    (
+        "Kava", "herb",
+        ("kava", "kava kava", "piper methysticum"),
+        ("relaxation", "anxiety relief"),
+        "Herb used for anxiety and relaxation"
+    ),
+    (
+        "Ginseng", "herb",
+        ("ginseng", "panax ginseng", "asian ginseng"),
+        ("energy", "stimulation", "cognitive enhancement"),
+        "Popular herb used for energy and mental clarity"
+    ),
+    (
+        "Chamomile", "herb",
+        ("chamomile", "chamomile tea"),
+        ("relaxation", "mild sedation", "digestive aid"),
+        "Gentle herb commonly used in teas for relaxation"
+    ),
+    (
+        "Ginkgo Biloba", "herb",
+        ("ginkgo", "ginkgo biloba", "maidenhair tree"),
+        ("cognitive enhancement", "circulation"),
+        "Herb used for memory and circulation support"
+    ),
+    (
+        "Passionflower", "herb",
+        ("passionflower", "passiflora"),
+        ("relaxation", "anxiety relief", "sleep aid"),
+        "Herb used for anxiety and sleep support"
+    ),
+    # Common medications
+    (
+        "Warfarin", "prescription",
+        ("warfarin", "coumadin"),
+        ("blood thinner", "anticoagulant"),
+        "Prescription blood thinner"
+    ),
+    (
+        "SSRIs", "prescription",
+        ("ssri", "ssris", "selective serotonin reuptake inhibitor"),
+        ("antidepressant",),
+        "Common class of antidepressant medications"
+    ),
+    (
+        "Benzodiazepines", "prescription",
+        ("benzodiazepine", "benzodiazepines", "benzos"),
+        ("sedation", "anxiety relief"),
+        "Prescription medications for anxiety and sedation"
+    ),
+    (
+        "Ibuprofen", "otc",
+        ("ibuprofen", "advil", "motrin"),
+        ("pain relief", "anti-inflammatory"),
+        "Common over-the-counter pain reliever"
+    ),
+    (
+        "Aspirin", "otc",
+        ("aspirin", "acetylsalicylic acid"),
+        ("pain relief", "blood thinner"),
+        "Common over-the-counter pain reliever and blood thinner"
+    ),
+    (
+        "Diphenhydramine", "otc",
+        ("diphenhydramine", "benadryl"),
+        ("antihistamine", "sedation"),
+        "Common over-the-counter antihistamine and sleep aid"
+    ),
+)
+
+# Built-in interactions: (substance1, substance2, severity, effects, description, recommendation)
+_INTERACTION_DATA = (
+    (
+        "St. John's Wort", "SSRIs", InteractionSeverity.SEVERE,
+        ("serotonin syndrome", "confusion", "agitation", "rapid heart rate"),
+        "St. John's Wort can increase serotonin levels dangerously when combined with SSRIs",
+        "DO NOT COMBINE. Consult healthcare provider immediately if taking both."
+    ),
+    (
+        "Valerian Root", "Benzodiazepines", InteractionSeverity.MAJOR,
+        ("excessive sedation", "drowsiness", "impaired coordination"),
+        "Both substances have sedative effects that can be dangerously enhanced",
+        "Avoid combination. If needed, consult healthcare provider for proper dosing."
+    ),
+    (
+        "Valerian Root", "Diphenhydramine", InteractionSeverity.MODERATE,
+        ("excessive drowsiness", "sedation"),
+        "Combining sedative herbs with antihistamines can cause excessive drowsiness",
+        "Avoid driving or operating machinery. Consider reducing doses or timing separately."
+    ),
+    (
+        "Kava", "Benzodiazepines", InteractionSeverity.MAJOR,
+        ("excessive sedation", "liver damage risk"),
+        "Kava combined with benzodiazepines increases sedation and liver toxicity risk",
+        "Avoid combination. Consult healthcare provider."
+    ),
+    (
+        "Ginkgo Biloba", "Warfarin", InteractionSeverity.MAJOR,
+        ("increased bleeding risk", "bruising"),
+        "Ginkgo has blood-thinning properties that enhance warfarin's effects",
+        "Avoid combination. Requires close monitoring if used together."
+    ),
+    (
+        "Ginkgo Biloba", "Aspirin", InteractionSeverity.MODERATE,
+        ("increased bleeding risk",),
+        "Both substances have blood-thinning effects",
+        "Use caution. Monitor for unusual bleeding or bruising."
+    ),
+    (
+        "Ginkgo Biloba", "Ibuprofen", InteractionSeverity.MODERATE,
+        ("increased bleeding risk",),
+        "Ginkgo may enhance the blood-thinning effects of NSAIDs",
+        "Use caution. Monitor for unusual bleeding or bruising."
+    ),
+    (
+        "Ginseng", "Warfarin", InteractionSeverity.MODERATE,
+        ("altered blood clotting", "reduced warfarin effectiveness"),
+        "Ginseng may interfere with warfarin's anticoagulant effects",
+        "Avoid or use with close medical supervision."
+    ),
+    (
+        "Chamomile", "Warfarin", InteractionSeverity.MINOR,
+        ("potential increased bleeding risk",),
+        "Chamomile may have mild blood-thinning effects",
+        "Generally safe in tea form, but monitor if using concentrated extracts."
+    ),
+    (
+        "Chamomile", "Benzodiazepines", InteractionSeverity.MINOR,
+        ("mild additional sedation",),
+        "Chamomile has mild sedative effects that may add to benzodiazepines",
+        "Generally safe in moderate amounts. Avoid excessive use."
+    ),
+    (
+        "Passionflower", "Benzodiazepines", InteractionSeverity.MODERATE,
+        ("excessive sedation", "drowsiness"),
+        "Both have sedative effects that can be enhanced when combined",
+        "Use caution. May need to adjust dosages. Consult healthcare provider."
+    ),
+)
+
+
 class InteractionDatabase:
     """Database of substances and their interactions"""
     
-    # Severity order for sorting (minor to severe)
-    SEVERITY_ORDER = [
-        InteractionSeverity.MINOR.value,
-        InteractionSeverity.MODERATE.value,
-        InteractionSeverity.MAJOR.value,
-        InteractionSeverity.SEVERE.value
-    ]
-    
     def __init__(self):
         self.substances: Dict[str, Substance] = {}
+        # Substances keyed by canonical name only (no aliases)
+        self._canonical: Dict[str, Substance] = {}
+        # Kept sorted from most to least severe once the index is built
         self.interactions: List[Interaction] = []
+        # Small integer id per canonical substance name
+        self._name_to_id: Dict[str, int] = {}
+        # Adjacency index: substance id -> [(other substance id, position in
+        # self.interactions)] for every interaction the substance takes part in
+        self._neighbors: Dict[int, List[Tuple[int, int]]] = defaultdict(list)
+        self._index_stale = False
+        # Alternation over every name and alias, compiled on first use
+        self._name_pattern: Optional[Pattern[str]] = None
+        # Memoized name lookup; repeated queries skip the lowercase normalization
+        self._cached_lookup = functools.lru_cache(maxsize=1024)(self._lookup)
         self._initialize_database()
     
     def _initialize_database(self):
         """Initialize the database with common substances and interactions"""
-        
-        # Add common herbal supplements
-        self._add_substance(Substance(
-            name="St. John's Wort",
-            category="herb",
-            common_names=["st johns wort", "hypericum", "hypericum perforatum"],
-            primary_effects=["mood elevation", "antidepressant"],
-            description="Popular herbal supplement used for mild to moderate depression"
-        ))
-        
-        self._add_substance(Substance(
-            name="Valerian Root",
-            category="herb",
-            common_names=["valerian", "valerian root"],
-            primary_effects=["relaxation", "sedation", "sleep aid"],
-            description="Herbal supplement commonly used for relaxation and sleep"
-        ))
-        
-        self._add_substance(Substance(
-            name="Kava",
-            category="herb",
-            common_names=["kava", "kava kava", "piper methysticum"],
-            primary_effects=["relaxation", "anxiety relief"],
-            description="Herb used for anxiety and relaxation"
-        ))
-        
-        self._add_substance(Substance(
-            name="Ginseng",
-            category="herb",
-            common_names=["ginseng", "panax ginseng", "asian ginseng"],
-            primary_effects=["energy", "stimulation", "cognitive enhancement"],
-            description="Popular herb used for energy and mental clarity"
-        ))
-        
-        self._add_substance(Substance(
-            name="Chamomile",
-            category="herb",
-            common_names=["chamomile", "chamomile tea"],
-            primary_effects=["relaxation", "mild sedation", "digestive aid"],
-            description="Gentle herb commonly used in teas for relaxation"
-        ))
-        
-        self._add_substance(Substance(
-            name="Ginkgo Biloba",
-            category="herb",
-            common_names=["ginkgo", "ginkgo biloba", "maidenhair tree"],
-            primary_effects=["cognitive enhancement", "circulation"],
-            description="Herb used for memory and circulation support"
-        ))
-        
-        self._add_substance(Substance(
-            name="Passionflower",
-            category="herb",
-            common_names=["passionflower", "passiflora"],
-            primary_effects=["relaxation", "anxiety relief", "sleep aid"],
-            description="Herb used for anxiety and sleep support"
-        ))
-        
-        # Add common medications
-        self._add_substance(Substance(
-            name="Warfarin",
-            category="prescription",
-            common_names=["warfarin", "coumadin"],
-            primary_effects=["blood thinner", "anticoagulant"],
-            description="Prescription blood thinner"
-        ))
-        
-        self._add_substance(Substance(
-            name="SSRIs",
-            category="prescription",
-            common_names=["ssri", "ssris", "selective serotonin reuptake inhibitor"],
-            primary_effects=["antidepressant"],
-            description="Common class of antidepressant medications"
-        ))
-        
-        self._add_substance(Substance(
-            name="Benzodiazepines",
-            category="prescription",
-            common_names=["benzodiazepine", "benzodiazepines", "benzos"],
-            primary_effects=["sedation", "anxiety relief"],
-            description="Prescription medications for anxiety and sedation"
-        ))
-        
-        self._add_substance(Substance(
-            name="Ibuprofen",
-            category="otc",
-            common_names=["ibuprofen", "advil", "motrin"],
-            primary_effects=["pain relief", "anti-inflammatory"],
-            description="Common over-the-counter pain reliever"
-        ))
-        
-        self._add_substance(Substance(
-            name="Aspirin",
-            category="otc",
-            common_names=["aspirin", "acetylsalicylic acid"],
-            primary_effects=["pain relief", "blood thinner"],
-            description="Common over-the-counter pain reliever and blood thinner"
-        ))
-        
-        self._add_substance(Substance(
-            name="Diphenhydramine",
-            category="otc",
-            common_names=["diphenhydramine", "benadryl"],
-            primary_effects=["antihistamine", "sedation"],
-            description="Common over-the-counter antihistamine and sleep aid"
-        ))
-        
-        # Add interactions
-        self._add_interaction(Interaction(
-            substance1="St. John's Wort",
-            substance2="SSRIs",
-            severity=InteractionSeverity.SEVERE,
-            effects=["serotonin syndrome", "confusion", "agitation", "rapid heart rate"],
-            description="St. John's Wort can increase serotonin levels dangerously when combined with SSRIs",
-            recommendation="DO NOT COMBINE. Consult healthcare provider immediately if taking both."
-        ))
-        
-        self._add_interaction(Interaction(
-            substance1="Valerian Root",
-            substance2="Benzodiazepines",
-            severity=InteractionSeverity.MAJOR,
-            effects=["excessive sedation", "drowsiness", "impaired coordination"],
-            description="Both substances have sedative effects that can be dangerously enhanced",
-            recommendation="Avoid combination. If needed, consult healthcare provider for proper dosing."
-        ))
-        
-        self._add_interaction(Interaction(
-            substance1="Valerian Root",
-            substance2="Diphenhydramine",
-            severity=InteractionSeverity.MODERATE,
-            effects=["excessive drowsiness", "sedation"],
-            description="Combining sedative herbs with antihistamines can cause excessive drowsiness",
-            recommendation="Avoid driving or operating machinery. Consider reducing doses or timing separately."
-        ))
-        
-        self._add_interaction(Interaction(
-            substance1="Kava",
-            substance2="Benzodiazepines",
-            severity=InteractionSeverity.MAJOR,
-            effects=["excessive sedation", "liver damage risk"],
-            description="Kava combined with benzodiazepines increases sedation and liver toxicity risk",
-            recommendation="Avoid combination. Consult healthcare provider."
-        ))
-        
-        self._add_interaction(Interaction(
-            substance1="Ginkgo Biloba",
-            substance2="Warfarin",
-            severity=InteractionSeverity.MAJOR,
-            effects=["increased bleeding risk", "bruising"],
-            description="Ginkgo has blood-thinning properties that enhance warfarin's effects",
-            recommendation="Avoid combination. Requires close monitoring if used together."
-        ))
-        
-        self._add_interaction(Interaction(
-            substance1="Ginkgo Biloba",
-            substance2="Aspirin",
-            severity=InteractionSeverity.MODERATE,
-            effects=["increased bleeding risk"],
-            description="Both substances have blood-thinning effects",
-            recommendation="Use caution. Monitor for unusual bleeding or bruising."
-        ))
-        
-        self._add_interaction(Interaction(
-            substance1="Ginkgo Biloba",
-            substance2="Ibuprofen",
-            severity=InteractionSeverity.MODERATE,
-            effects=["increased bleeding risk"],
-            description="Ginkgo may enhance the blood-thinning effects of NSAIDs",
-            recommendation="Use caution. Monitor for unusual bleeding or bruising."
-        ))
-        
-        self._add_interaction(Interaction(
-            substance1="Ginseng",
-            substance2="Warfarin",
-            severity=InteractionSeverity.MODERATE,
-            effects=["altered blood clotting", "reduced warfarin effectiveness"],
-            description="Ginseng may interfere with warfarin's anticoagulant effects",
-            recommendation="Avoid or use with close medical supervision."
-        ))
-        
-        self._add_interaction(Interaction(
-            substance1="Chamomile",
-            substance2="Warfarin",
-            severity=InteractionSeverity.MINOR,
-            effects=["potential increased bleeding risk"],
-            description="Chamomile may have mild blood-thinning effects",
-            recommendation="Generally safe in tea form, but monitor if using concentrated extracts."
-        ))
-        
-        self._add_interaction(Interaction(
-            substance1="Chamomile",
-            substance2="Benzodiazepines",
-            severity=InteractionSeverity.MINOR,
-            effects=["mild additional sedation"],
-            description="Chamomile has mild sedative effects that may add to benzodiazepines",
-            recommendation="Generally safe in moderate amounts. Avoid excessive use."
-        ))
-        
-        self._add_interaction(Interaction(
-            substance1="Passionflower",
-            substance2="Benzodiazepines",
-            severity=InteractionSeverity.MODERATE,
-            effects=["excessive sedation", "drowsiness"],
-            description="Both have sedative effects that can be enhanced when combined",
-            recommendation="Use caution. May need to adjust dosages. Consult healthcare provider."
-        ))
+        for name, category, common_names, primary_effects, description in _SUBSTANCE_DATA:
+            self._add_substance(Substance(
+                name, category, list(common_names), list(primary_effects), description
+            ))
+        
+        for (substance1, substance2, severity,
+             effects, description, recommendation) in _INTERACTION_DATA:
+            self._add_interaction(Interaction(
+                substance1, substance2, severity, list(effects), description, recommendation
+            ))
+        
+        self._rebuild_interaction_index()
     
     def _add_substance(self, substance: Substance):
         """Add a substance to the database"""
-        self.substances[substance.name.lower()] = substance
-        for name in substance.common_names:
-            self.substances[name.lower()] = substance
+        self._canonical[substance.name] = substance
+        self._substance_id(substance.name)
+        # Keys are lowered and interned once; user input is never interned
+        for name in (substance.name, *substance.common_names):
+            self.substances[sys.intern(name.lower())] = substance
+        self._cached_lookup.cache_clear()
+        self._name_pattern = None
     
     def _add_interaction(self, interaction: Interaction):
         """Add an interaction to the database"""
         self.interactions.append(interaction)
+        self._index_stale = True
+    
+    def _rebuild_interaction_index(self):
+        """Sort interactions by descending severity and rebuild the adjacency index"""
+        # Stable sort: equally severe interactions keep the order they were added
+        self.interactions.sort(key=lambda x: _SEVERITY_RANK[x.severity], reverse=True)
+        self._neighbors.clear()
+        for position, interaction in enumerate(self.interactions):
+            id1 = self._substance_id(interaction.substance1)
+            id2 = self._substance_id(interaction.substance2)
+            self._neighbors[id1].append((id2, position))
+            if id2 != id1:
+                self._neighbors[id2].append((id1, position))
+        self._index_stale = False
+    
+    def _substance_id(self, name: str) -> int:
+        """Return the integer id for a canonical name, assigning one if new"""
+        return self._name_to_id.setdefault(name, len(self._name_to_id))
+    
+    def all_substances(self) -> List[Substance]:
+        """Return each substance once, in the order it was added"""
+        return list(self._canonical.values())
+    
+    def _lookup(self, name: str) -> Optional[Substance]:
+        """Uncached lookup of a substance by name or common name"""
+        return self.substances.get(name.lower())
     
     def find_substance(self, name: str) -> Optional[Substance]:
         """Find a substance by name or common name"""
-        return self.substances.get(name.lower())
+        return self._cached_lookup(name)
+    
+    def find_all_in_text(self, text: str) -> List[Substance]:
+        """Find every known substance mentioned in free text, in order of appearance"""
+        if self._name_pattern is None:
+            # Longest names first so e.g. "kava kava" wins over "kava"
+            names = sorted(self.substances, key=len, reverse=True)
+            alternation = '|'.join(re.escape(name) for name in names)
+            self._name_pattern = re.compile(rf'\b(?:{alternation})\b', re.IGNORECASE)
+        
+        found: Dict[str, Substance] = {}
+        for match in self._name_pattern.finditer(text):
+            substance = self.find_substance(match.group(0))
+            if substance:
+                found.setdefault(substance.name, substance)
+        return list(found.values())
     
     def check_interactions(self, substance_names: List[str]) -> List[Interaction]:
         """Check for interactions between multiple substances"""
-        found_interactions = []
+        if self._index_stale:
+            self._rebuild_interaction_index()
         
-        # Normalize substance names
-        normalized_names = set()
+        found_positions = []
+        
+        # Normalize substance names to ids (ordered, without duplicates)
+        normalized_ids = {}
         for name in substance_names:
             substance = self.find_substance(name)
             if substance:
-                normalized_names.add(substance.name)
-        
-        # Check all pairs for interactions
-        for interaction in self.interactions:
-            if (interaction.substance1 in normalized_names and 
-                interaction.substance2 in normalized_names):
-                found_interactions.append(interaction)
-        
-        return sorted(found_interactions, 
-                     key=lambda x: self.SEVERITY_ORDER.index(x.severity.value),
-                     reverse=True)
+                normalized_ids[self._name_to_id[substance.name]] = None
+        
+        # An interaction needs at least two known substances
+        if len(normalized_ids) < 2:
+            return []
+        
+        # Walk each query substance's neighbors; substances without any
+        # interactions cost nothing. Each pair is reported from its lower id.
+        for substance_id in normalized_ids:
+            for other_id, position in self._neighbors.get(substance_id, ()):
+                if other_id > substance_id and other_id in normalized_ids:
+                    found_positions.append(position)
+        
+        # Positions already encode severity order, so a plain int sort suffices
+        found_positions.sort()
+        return [self.interactions[position] for position in found_positions]
+
+
+class ApothecaryShell(cmd.Cmd):
+    """Line-editing prompt used by interactive mode to collect substances"""
+    
+    COMMANDS = ('done', 'list', 'paste', 'quit')
+    
+    def __init__(self, app: 'ApothecaryDaemon'):
+        super().__init__()
+        self.app = app
+        self.db = app.db
+        self.substances: List[str] = []
+        self.substances_seen: Set[str] = set()
+        self.quit_requested = False
+        # Names offered for tab completion (canonical names and aliases)
+        self.completions = sorted(self.db.substances)
+        self._update_prompt()
+    
+    def _update_prompt(self):
+        """Show the number of the next substance in the prompt"""
+        self.prompt = f"Enter substance #{len(self.substances) + 1} (or command): "
+    
+    def precmd(self, line: str) -> str:
+        """Accept command words in any case"""
+        command, _, arg = line.strip().partition(' ')
+        if command.lower() in self.COMMANDS:
+            # Only the command word is folded; paste keeps its text as typed
+            return f"{command.lower()} {arg}".rstrip()
+        return line
+    
+    def postcmd(self, stop: bool, line: str) -> bool:
+        """Refresh the prompt after every command"""
+        self._update_prompt()
+        return stop
+    
+    def emptyline(self) -> bool:
+        """Ignore blank input instead of repeating the last command"""
+        return False
+    
+    def do_done(self, arg: str) -> bool:
+        """Finish entering substances and check for interactions"""
+        if len(self.substances) < 2:
+            print("⚠️  Please enter at least 2 substances to check for interactions.\n")
+            return False
+        return True
+    
+    def do_list(self, arg: str) -> bool:
+        """Display all substances in the database"""
+        print("\n📚 Available substances in database:")
+        for substance in self.db.all_substances():
+            print(f"   • {substance.name} ({substance.category})")
+        print()
+        return False
+    
+    def do_quit(self, arg: str) -> bool:
+        """Exit the application"""
+        print("\nThank you for using ApothecaryDaemon. Stay safe!")
+        self.quit_requested = True
+        return True
+    
+    def do_EOF(self, arg: str) -> bool:
+        """Exit the application (Ctrl-D)"""
+        print()
+        return self.do_quit(arg)
+    
+    def do_paste(self, arg: str) -> bool:
+        """Add every known substance mentioned in a line of text: paste <text>"""
+        if not arg:
+            print("⚠️  Usage: paste <text listing your medications and supplements>\n")
+            return False
+        
+        found = self.db.find_all_in_text(arg)
+        if not found:
+            print("⚠️  No known substances found in that text. Try 'list' to see available substances.\n")
+        for substance in found:
+            self._add_substance(substance)
+        return False
+    
+    def default(self, line: str) -> bool:
+        """Treat any other input as a substance name"""
+        substance = self.db.find_substance(line)
+        if substance:
+            self._add_substance(substance)
+        else:
+            print(f"⚠️  '{line}' not found in database. Try 'list' to see available substances.\n")
+        return False
+    
+    def _add_substance(self, substance: Substance):
+        """Add a substance to this session unless it was already added"""
+        if substance.name not in self.substances_seen:
+            self.substances.append(substance.name)
+            self.substances_seen.add(substance.name)
+            self.app.display_substance_info(substance)
+            print(f"\n✓ Added {substance.name}\n")
+        else:
+            print(f"⚠️  {substance.name} already added.\n")
+    
+    def completenames(self, text: str, *ignored) -> List[str]:
+        """Complete command names and substance names"""
+        prefix = text.lower()
+        return (super().completenames(text, *ignored) +
+                [name for name in self.completions if name.startswith(prefix)])
+    
+    def completedefault(self, text: str, line: str, begidx: int, endidx: int) -> List[str]:
+        """Complete the remaining words of multi-word substance names"""
+        typed = line[:endidx].lower()
+        return [name[begidx:] for name in self.completions
+                if name.startswith(typed) and len(name) > begidx]
 
 
 class ApothecaryDaemon:
@@ -321,96 +468,67 @@ class ApothecaryDaemon:
     def __init__(self):
         self.db = InteractionDatabase()
     
+    # Welcome banner, rendered once
+    WELCOME_BANNER = "\n".join([
+        "=" * 70,
+        "ApothecaryDaemon - Herbal Supplement & Medication Interaction Checker",
+        "=" * 70,
+        "",
+        "⚠️  WARNING: This tool is for informational purposes only!",
+        "   This is NOT a replacement for professional medical advice.",
+        "   Always consult with a healthcare provider before combining",
+        "   supplements and medications.",
+        "",
+        "=" * 70,
+        "",
+    ])
+    
+    def _write_lines(self, lines: List[str]):
+        """Write several lines to stdout in a single call"""
+        sys.stdout.write("\n".join(lines) + "\n")
+    
     def display_welcome(self):
         """Display welcome message"""
-        print("=" * 70)
-        print("ApothecaryDaemon - Herbal Supplement & Medication Interaction Checker")
-        print("=" * 70)
-        print()
-        print("⚠️  WARNING: This tool is for informational purposes only!")
-        print("   This is NOT a replacement for professional medical advice.")
-        print("   Always consult with a healthcare provider before combining")
-        print("   supplements and medications.")
-        print()
-        print("=" * 70)
-        print()
+        sys.stdout.write(self.WELCOME_BANNER + "\n")
     
     def display_substance_info(self, substance: Substance):
         """Display information about a substance"""
-        print(f"\n📋 {substance.name}")
-        print(f"   Category: {substance.category.upper()}")
-        print(f"   Description: {substance.description}")
-        print(f"   Primary Effects: {', '.join(substance.primary_effects)}")
+        self._write_lines([
+            f"\n📋 {substance.name}",
+            f"   Category: {substance.category.upper()}",
+            f"   Description: {substance.description}",
+            f"   Primary Effects: {', '.join(substance.primary_effects)}",
+        ])
     
     def display_interaction(self, interaction: Interaction):
         """Display an interaction warning"""
         symbol = self.SEVERITY_SYMBOLS.get(interaction.severity, "⚠️ ")
         
-        print(f"\n{symbol} {interaction.severity.value.upper()} INTERACTION")
-        print(f"   Between: {interaction.substance1} + {interaction.substance2}")
-        print(f"   Effects: {', '.join(interaction.effects)}")
-        print(f"   Details: {interaction.description}")
-        print(f"   ➜ {interaction.recommendation}")
-        print()
+        self._write_lines([
+            f"\n{symbol} {interaction.severity.value.upper()} INTERACTION",
+            f"   Between: {interaction.substance1} + {interaction.substance2}",
+            f"   Effects: {', '.join(interaction.effects)}",
+            f"   Details: {interaction.description}",
+            f"   ➜ {interaction.recommendation}",
+            "",
+        ])
     
-    def interactive_mode(self):
-        """Run in interactive mode"""
-        self.display_welcome()
-        
-        print("Enter substances to check (herbs, supplements, medications).")
-        print("Type 'done' when finished, 'list' to see available substances, or 'quit' to exit.")
-        print()
-        
-        substances = []
-        
-        while True:
-            user_input = input(f"Enter substance #{len(substances) + 1} (or command): ").strip()
-            
-            if not user_input:
-                continue
-            
-            if user_input.lower() == 'quit':
-                print("\nThank you for using ApothecaryDaemon. Stay safe!")
-                return
-            
-            if user_input.lower() == 'done':
-                if len(substances) < 2:
-                    print("⚠️  Please enter at least 2 substances to check for interactions.\n")
-                    continue
-                break
-            
-            if user_input.lower() == 'list':
-                print("\n📚 Available substances in database:")
-                seen = set()
-                for name, substance in self.db.substances.items():
-                    if substance.name not in seen:
-                        print(f"   • {substance.name} ({substance.category})")
-                        seen.add(substance.name)
-                print()
-                continue
-            
-            substance = self.db.find_substance(user_input)
-            if substance:
-                if substance.name not in substances:
-                    substances.append(substance.name)
-                    self.display_substance_info(substance)
-                    print(f"\n✓ Added {substance.name}\n")
-                else:
-                    print(f"⚠️  {substance.name} already added.\n")
-            else:
-                print(f"⚠️  '{user_input}' not found in database. Try 'list' to see available substances.\n")
-        
-        # Check interactions
+    def report_interactions(self, substances: List[str]):
+        """Check substances for interactions and print the results and summary"""
         print("\n" + "=" * 70)
         print("CHECKING FOR INTERACTIONS...")
         print("=" * 70)
         
         interactions = self.db.check_interactions(substances)
         
+        # Display and look for critical interactions in the same pass
+        saw_critical = False
         if interactions:
             print(f"\n⚠️  Found {len(interactions)} interaction(s):\n")
             for interaction in interactions:
                 self.display_interaction(interaction)
+                if interaction.severity in _CRITICAL_SEVERITIES:
+                    saw_critical = True
         else:
             print("\n✓ No known interactions found in database.")
             print("  However, this does not guarantee safety. Always consult a healthcare provider.")
@@ -421,13 +539,27 @@ class ApothecaryDaemon:
         print(f"Substances checked: {', '.join(substances)}")
         print(f"Interactions found: {len(interactions)}")
         
-        if any(i.severity in [InteractionSeverity.MAJOR, InteractionSeverity.SEVERE] 
-               for i in interactions):
+        if saw_critical:
             print("\n🚨 CRITICAL: Major or severe interactions detected!")
             print("   Consult a healthcare provider before using these substances together.")
         
         print("\n")
     
+    def interactive_mode(self):
+        """Run in interactive mode"""
+        self.display_welcome()
+        
+        print("Enter substances to check (herbs, supplements, medications).")
+        print("Type 'done' when finished, 'list' to see available substances, or 'quit' to exit.")
+        print()
+        
+        shell = ApothecaryShell(self)
+        shell.cmdloop()
+        if shell.quit_requested:
+            return
+        
+        self.report_interactions(shell.substances)
+    
     def batch_check(self, substance_names: List[str]):
         """Check interactions for a list of substances in batch mode"""
         self.display_welcome()
@@ -436,13 +568,15 @@ class ApothecaryDaemon:
         
         # Find all substances
         found_substances = []
+        found_seen: Set[str] = set()
         not_found = []
         
         for name in substance_names:
             substance = self.db.find_substance(name)
             if substance:
-                if substance.name not in found_substances:
+                if substance.name not in found_seen:
                     found_substances.append(substance.name)
+                    found_seen.add(substance.name)
                     self.display_substance_info(substance)
             else:
                 not_found.append(name)
@@ -454,33 +588,7 @@ class ApothecaryDaemon:
             print("\n⚠️  Need at least 2 substances to check for interactions.")
             return
         
-        # Check interactions
-        print("\n" + "=" * 70)
-        print("CHECKING FOR INTERACTIONS...")
-        print("=" * 70)
-        
-        interactions = self.db.check_interactions(found_substances)
-        
-        if interactions:
-            print(f"\n⚠️  Found {len(interactions)} interaction(s):\n")
-            for interaction in interactions:
-                self.display_interaction(interaction)
-        else:
-            print("\n✓ No known interactions found in database.")
-            print("  However, this does not guarantee safety. Always consult a healthcare provider.")
-        
-        print("\n" + "=" * 70)
-        print("SUMMARY")
-        print("=" * 70)
-        print(f"Substances checked: {', '.join(found_substances)}")
-        print(f"Interactions found: {len(interactions)}")
-        
-        if any(i.severity in [InteractionSeverity.MAJOR, InteractionSeverity.SEVERE] 
-               for i in interactions):
-            print("\n🚨 CRITICAL: Major or severe interactions detected!")
-            print("   Consult a healthcare provider before using these substances together.")
-        
-        print("\n")
+        self.report_interactions(found_substances)
 
 
 def main():
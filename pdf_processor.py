@@ -10,12 +10,20 @@ import os
 import re
 import sys
 import json
+import bisect
+import difflib
 import argparse
+import functools
+import itertools
 import logging
+import importlib.util
+import multiprocessing
 from pathlib import Path
-from dataclasses import dataclass, field, asdict
-from typing import List, Dict, Optional, Set
-from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from types import MappingProxyType
+from dataclasses import dataclass, field, fields
+from typing import FrozenSet, Iterable, List, Dict, Mapping, Optional, Set, Tuple, Pattern
+from collections import Counter, defaultdict
 from enum import Enum
 
 
@@ -26,26 +34,28 @@ class MedicineTradition(Enum):
     TCM = "tcm"
     MIXED = "mixed"
 
-# Optional imports with graceful degradation
-try:
-    import pdfplumber
-    HAS_PDFPLUMBER = True
-except ImportError:
-    HAS_PDFPLUMBER = False
+# Optional dependencies with graceful degradation. The heavy PDF/OCR backends
+# are only probed here; they are imported by the code that actually uses them.
+HAS_PDFPLUMBER = importlib.util.find_spec("pdfplumber") is not None
+HAS_PYPDF2 = importlib.util.find_spec("PyPDF2") is not None
+HAS_OCR = all(importlib.util.find_spec(name) is not None
+              for name in ("pytesseract", "pdf2image", "PIL"))
 
 try:
-    import PyPDF2
-    HAS_PYPDF2 = True
+    import ahocorasick
+    HAS_AHOCORASICK = True
 except ImportError:
-    HAS_PYPDF2 = False
+    HAS_AHOCORASICK = False
 
 try:
-    import pytesseract
-    from pdf2image import convert_from_path
-    from PIL import Image
-    HAS_OCR = True
+    import orjson
+    HAS_ORJSON = True
 except ImportError:
-    HAS_OCR = False
+    HAS_ORJSON = False
+
+
+# Use slotted dataclasses where supported (Python 3.10+) to shrink records
+_DATACLASS_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
 
 
 # Configure logging
@@ -56,7 +66,7 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class ExtractedHerb:
     """Represents an herb extracted from a document with tradition-specific properties"""
     name: str
@@ -86,7 +96,62 @@ class ExtractedHerb:
     
     def to_dict(self) -> dict:
         """Convert to dictionary for JSON export"""
-        return asdict(self)
+        # Fields only hold strings, lists of strings and a str->str dict, so
+        # copying each container equals asdict()'s deep copy at a fraction of the cost
+        result = {}
+        for name in _EXTRACTED_HERB_FIELDS:
+            value = getattr(self, name)
+            if isinstance(value, list):
+                value = list(value)
+            elif isinstance(value, dict):
+                value = dict(value)
+            result[name] = value
+        return result
+
+
+_EXTRACTED_HERB_FIELDS = tuple(f.name for f in fields(ExtractedHerb))
+
+
+@dataclass(frozen=True, eq=False, **_DATACLASS_OPTIONS)
+class HerbRecord(Mapping):
+    """Read-only herb dictionary entry; also usable as a mapping of its set fields"""
+    name: str
+    scientific_name: Optional[str] = None
+    sanskrit_name: Optional[str] = None
+    pinyin_name: Optional[str] = None
+    chinese_name: Optional[str] = None
+    common_names: Tuple[str, ...] = ()
+    tradition: str = ""
+    # Derived lookup fields; not part of the mapping view
+    species_id: Optional[str] = None  # interned lowercase scientific name
+    # Casefolded common names for membership tests
+    common_name_keys: FrozenSet[str] = field(default=frozenset(), repr=False)
+    
+    def __getitem__(self, key: str):
+        # Dictionary view: keys are the fields other than name that are set
+        if key in _HERB_RECORD_KEYS:
+            value = getattr(self, key)
+            if value is not None:
+                return value
+        raise KeyError(key)
+    
+    def __iter__(self):
+        return (key for key in _HERB_RECORD_KEYS if getattr(self, key) is not None)
+    
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+    
+    def copy(self) -> dict:
+        """Return a mutable dict of the record's fields, like dict.copy()"""
+        return dict(self)
+    
+    def has_common_name(self, name: str) -> bool:
+        """Whether name is one of this herb's common names, ignoring case"""
+        return name.strip().casefold() in self.common_name_keys
+
+
+_HERB_RECORD_KEYS = tuple(f.name for f in fields(HerbRecord)
+                          if f.name not in ('name', 'species_id', 'common_name_keys'))
 
 
 # ============================================================================
@@ -871,202 +936,606 @@ TCM_HERBS = {
 }
 
 
+# Placeholder "scientific names" that do not identify a single herb
+_NON_SPECIFIC_SCIENTIFIC_NAMES = {"combination formula"}
+
+
+def _freeze_herb_dictionary(herbs: Dict[str, dict]) -> MappingProxyType:
+    """Return a read-only view of a herb dictionary with HerbRecord entries"""
+    frozen = {}
+    for name, entry in herbs.items():
+        entry = dict(entry)
+        entry['common_names'] = tuple(entry.get('common_names', ()))
+        entry['common_name_keys'] = frozenset(n.casefold() for n in entry['common_names'])
+        # Interned so lookups and tradition/scientific-name comparisons
+        # across the three dictionaries share one string object
+        for key in ('tradition', 'scientific_name'):
+            if entry.get(key):
+                entry[key] = sys.intern(entry[key])
+        # Entries for the same species share an interned species id, across
+        # traditions (e.g. Ginseng and Ren Shen are both "panax ginseng")
+        species = (entry.get('scientific_name') or '').lower()
+        if species and species not in _NON_SPECIFIC_SCIENTIFIC_NAMES:
+            entry['species_id'] = sys.intern(species)
+        name = sys.intern(name)
+        frozen[name] = HerbRecord(name=name, **entry)
+    return MappingProxyType(frozen)
+
+
+# The herb dictionaries are shared reference data (and back the alias index
+# below), so they are exposed read-only; copy an entry before modifying it
+KNOWN_HERBS = _freeze_herb_dictionary(KNOWN_HERBS)
+AYURVEDIC_HERBS = _freeze_herb_dictionary(AYURVEDIC_HERBS)
+TCM_HERBS = _freeze_herb_dictionary(TCM_HERBS)
+
+# Every casefolded common name, for a quick "is this any herb's common name" test
+_ALL_COMMON_NAMES = frozenset().union(*(
+    record.common_name_keys
+    for record in itertools.chain(KNOWN_HERBS.values(), AYURVEDIC_HERBS.values(),
+                                  TCM_HERBS.values())))
+
+# Tradition -> herb dictionary, for tradition-scoped queries without filtering
+_BY_TRADITION = MappingProxyType({
+    'western': KNOWN_HERBS,
+    'ayurvedic': AYURVEDIC_HERBS,
+    'tcm': TCM_HERBS,
+})
+
+# Stable integer id for each canonical herb name (Western, then Ayurvedic, then
+# TCM), so per-herb data can be kept in arrays indexed by id
+HERB_BY_ID: Tuple[str, ...] = tuple(dict.fromkeys(
+    itertools.chain(KNOWN_HERBS, AYURVEDIC_HERBS, TCM_HERBS)))
+HERB_ID = MappingProxyType({name: herb_id for herb_id, name in enumerate(HERB_BY_ID)})
+
+
+def is_common_name(token: str) -> bool:
+    """Whether token is a common name of any known herb, ignoring case"""
+    return token.strip().casefold() in _ALL_COMMON_NAMES
+
+
+def same_species(entry: HerbRecord, other: HerbRecord) -> bool:
+    """Whether two herb entries describe the same species (formulas never do)"""
+    species_id = entry.species_id
+    return species_id is not None and species_id is other.species_id
+
+
+def herbs_of(tradition: str) -> MappingProxyType:
+    """Return the herb dictionary for a tradition ('western', 'ayurvedic' or 'tcm')"""
+    try:
+        return _BY_TRADITION[tradition.strip().lower()]
+    except KeyError:
+        raise ValueError(f"Unknown tradition: {tradition!r}") from None
+
+
+# ============================================================================
+# HERB ALIAS INDEX
+# ============================================================================
+
+# Every lowercased name, alias and script name -> (canonical name, entry)
+_HERB_ALIAS_INDEX: Dict[str, tuple] = {}
+
+# The alias index keys in sorted order, for prefix search with bisect
+_SORTED_ALIASES: Tuple[str, ...] = ()
+
+
+def _build_alias_index():
+    """Index every herb by name, scientific name, common names and script names"""
+    _HERB_ALIAS_INDEX.clear()
+    herbs = list(itertools.chain(KNOWN_HERBS.items(), AYURVEDIC_HERBS.items(),
+                                 TCM_HERBS.items()))
+    # Canonical names first, so no herb's alias can shadow another herb's own
+    # name (e.g. Astragalus lists "Huang Qi"); the first tradition wins after that
+    for name, entry in herbs:
+        _HERB_ALIAS_INDEX.setdefault(name.lower(), (name, entry))
+    for name, entry in herbs:
+        aliases = [*entry.common_names]
+        for alias in (entry.scientific_name, entry.sanskrit_name,
+                      entry.pinyin_name, entry.chinese_name):
+            if alias:
+                aliases.append(alias)
+        for alias in aliases:
+            alias = alias.lower()
+            if alias in _NON_SPECIFIC_SCIENTIFIC_NAMES:
+                continue
+            _HERB_ALIAS_INDEX.setdefault(alias, (name, entry))
+    
+    global _SORTED_ALIASES
+    _SORTED_ALIASES = tuple(sorted(_HERB_ALIAS_INDEX))
+
+
+_build_alias_index()
+
+
+def lookup_herb(token: str) -> Optional[tuple]:
+    """Find a herb by any of its names; returns (canonical name, entry) or None"""
+    return _HERB_ALIAS_INDEX.get(token.strip().lower())
+
+
+def suggest_herbs(query: str, limit: int = 8) -> List[str]:
+    """Suggest canonical herb names for a partial or misspelled name"""
+    query = query.strip().lower()
+    if not query:
+        return []
+    
+    suggestions = []
+    # Aliases starting with the query are contiguous in sorted order
+    index = bisect.bisect_left(_SORTED_ALIASES, query)
+    while index < len(_SORTED_ALIASES) and _SORTED_ALIASES[index].startswith(query):
+        name = _HERB_ALIAS_INDEX[_SORTED_ALIASES[index]][0]
+        if name not in suggestions:
+            suggestions.append(name)
+            if len(suggestions) == limit:
+                return suggestions
+        index += 1
+    if suggestions:
+        return suggestions
+    
+    # Typo fallback: only score aliases that share the query's first letter
+    first = query[0]
+    start = bisect.bisect_left(_SORTED_ALIASES, first)
+    end = bisect.bisect_left(_SORTED_ALIASES, chr(ord(first) + 1), start)
+    for alias in difflib.get_close_matches(query, _SORTED_ALIASES[start:end], n=limit):
+        name = _HERB_ALIAS_INDEX[alias][0]
+        if name not in suggestions:
+            suggestions.append(name)
+    return suggestions
+
+
+def classify_tokens(tokens: Iterable[str]) -> List[Optional[str]]:
+    """Map each token to the canonical herb name it refers to (None if unknown)"""
+    index_get = _HERB_ALIAS_INDEX.get
+    classified = []
+    for token in tokens:
+        hit = index_get(token.strip().lower())
+        classified.append(hit[0] if hit else None)
+    return classified
+
+
 # ============================================================================
 # AYURVEDIC PATTERNS
 # ============================================================================
 
-AYURVEDIC_PATTERNS = [
-    r'(?:Dosha[s]?:\s*)([^\n]+)',
-    r'(?:Rasa[s]?:\s*)([^\n]+)',
-    r'(?:Guna[s]?:\s*)([^\n]+)',
-    r'(?:Virya:\s*)([^\n]+)',
-    r'(?:Vipaka:\s*)([^\n]+)',
-    r'(?:Prabhava:\s*)([^\n]+)',
-    r'(?:Balances?\s+)(Vata|Pitta|Kapha)',
-    r'(?:Aggravates?\s+)(Vata|Pitta|Kapha)',
-    r'(?:Pacifies?\s+)(Vata|Pitta|Kapha)',
-]
+def _labeled_field_pattern(labels: Tuple[str, ...], plural: bool) -> str:
+    """Pattern for a "Label: value" line that captures the value"""
+    label = '|'.join(labels)
+    if len(labels) > 1:
+        label = f'(?:{label})'
+    if plural:
+        label += '[s]?'
+    # Anchored to the start of a line (compiled with re.MULTILINE)
+    return rf'^[ \t]*(?:{label}:\s*)([^\n]+)'
+
+
+# "Label: value" fields as (field name, labels, plural allowed)
+AYURVEDIC_LABELED_FIELDS = (
+    ('dosha', ('Dosha',), True),
+    ('rasa', ('Rasa',), True),
+    ('guna', ('Guna',), True),
+    ('virya', ('Virya',), False),
+    ('vipaka', ('Vipaka',), False),
+    ('prabhava', ('Prabhava',), False),
+)
+
+# Keyword phrases, which may appear anywhere, as (field name, pattern)
+AYURVEDIC_PHRASE_FIELDS = (
+    ('balances', r'(?:Balances?\s+)(Vata|Pitta|Kapha)'),
+    ('aggravates', r'(?:Aggravates?\s+)(Vata|Pitta|Kapha)'),
+    ('pacifies', r'(?:Pacifies?\s+)(Vata|Pitta|Kapha)'),
+)
+
+AYURVEDIC_PATTERNS = (
+    [_labeled_field_pattern(labels, plural) for _, labels, plural in AYURVEDIC_LABELED_FIELDS]
+    + [pattern for _, pattern in AYURVEDIC_PHRASE_FIELDS]
+)
+
+# Field name for each entry of AYURVEDIC_PATTERNS
+AYURVEDIC_FIELDS = tuple(name for name, *_ in AYURVEDIC_LABELED_FIELDS + AYURVEDIC_PHRASE_FIELDS)
 
 
 # ============================================================================
 # TCM PATTERNS
 # ============================================================================
 
-TCM_PATTERNS = [
-    r'(?:Channel[s]?|Meridian[s]?:\s*)([^\n]+)',
-    r'(?:Temperature:\s*)([^\n]+)',
-    r'(?:Taste[s]?:\s*)([^\n]+)',
-    r'(?:Action[s]?:\s*)([^\n]+)',
-    r'(?:Tonifies?\s+)(Qi|Blood|Yin|Yang|Kidney|Liver|Heart|Spleen|Lung)',
-    r'(?:Clears?\s+)(Heat|Damp|Phlegm|Wind)',
-    r'(?:Moves?\s+)(Qi|Blood)',
-    r'(?:Enters?\s+the\s+)(Liver|Heart|Spleen|Lung|Kidney)',
-]
+TCM_LABELED_FIELDS = (
+    ('channel', ('Channel', 'Meridian'), True),
+    ('temperature', ('Temperature',), False),
+    ('taste', ('Taste',), True),
+    ('action', ('Action',), True),
+)
+
+TCM_PHRASE_FIELDS = (
+    ('tonifies', r'(?:Tonifies?\s+)(Qi|Blood|Yin|Yang|Kidney|Liver|Heart|Spleen|Lung)'),
+    ('clears', r'(?:Clears?\s+)(Heat|Damp|Phlegm|Wind)'),
+    ('moves', r'(?:Moves?\s+)(Qi|Blood)'),
+    ('enters', r'(?:Enters?\s+the\s+)(Liver|Heart|Spleen|Lung|Kidney)'),
+)
+
+TCM_PATTERNS = (
+    [_labeled_field_pattern(labels, plural) for _, labels, plural in TCM_LABELED_FIELDS]
+    + [pattern for _, pattern in TCM_PHRASE_FIELDS]
+)
+
+# Field name for each entry of TCM_PATTERNS
+TCM_FIELDS = tuple(name for name, *_ in TCM_LABELED_FIELDS + TCM_PHRASE_FIELDS)
+
+
+def _compile_field_regex(patterns: List[str], names: Tuple[str, ...]) -> Pattern:
+    """Join single-capture patterns into one regex whose named groups are the fields"""
+    alternatives = []
+    for pattern, name in zip(patterns, names):
+        # Turn the pattern's only capturing group into a named group
+        named = re.sub(r'\((?!\?)', f'(?P<{name}>', pattern, count=1)
+        alternatives.append(f'(?:{named})')
+    return re.compile('|'.join(alternatives), re.IGNORECASE | re.MULTILINE)
+
+
+# One compiled pass over the text extracts every field of each tradition
+AYURVEDIC_RE = _compile_field_regex(AYURVEDIC_PATTERNS, AYURVEDIC_FIELDS)
+TCM_RE = _compile_field_regex(TCM_PATTERNS, TCM_FIELDS)
+
+
+# ============================================================================
+# KEYWORD TAILS
+# ============================================================================
+
+# Case-insensitive regex matching treats these as 'i'/'s' too; mapping them
+# first keeps text.lower() the same length and equivalent to re.IGNORECASE
+_CASELESS_FIXES = str.maketrans({'\u0130': 'i', '\u0131': 'i', '\u017f': 's'})
+
+_DOSHA_KEYWORDS = ('vata', 'pitta', 'kapha')
+_PACIFY_VERBS = ('balance', 'balances', 'pacifie', 'pacifies')
+_AGGRAVATE_VERBS = ('aggravate', 'aggravates', 'increase', 'increases')
+_PACIFY_SUFFIXES = ('balancing', 'pacifying')
+_AGGRAVATE_SUFFIXES = ('aggravating', 'increasing')
+
+# (verb forms, keyword tails) for each TCM action, in reporting order
+_TCM_ACTION_RULES = (
+    (('tonify', 'tonifies'), ('qi', 'blood', 'yin', 'yang')),
+    (('clear', 'clears'), ('heat', 'damp', 'phlegm', 'wind')),
+    (('move', 'moves'), ('qi', 'blood')),
+    (('transform', 'transforms'), ('phlegm',)),
+    (('nourishe', 'nourishes'), ('blood', 'yin')),
+)
+
+
+def _trie_alternation(words: Iterable[str]) -> str:
+    """Regex source matching any of words, with shared prefixes factored out
+    
+    Like an alternation sorted longest first, the longest word that lets the
+    rest of the pattern match is preferred at each position, but the regex
+    engine tries one branch per character instead of every word in turn.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = None  # a word ends here
+    
+    def serialize(node: dict) -> str:
+        branches = [re.escape(char) + serialize(child) for char, child in node.items() if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        # Greedy "?": a longer word is tried before the one ending here
+        return f"(?:{body})?" if '' in node else body
+    
+    return serialize(trie)
+
+
+def _build_keyword_matcher(keywords):
+    """Build a matcher for lowercase keywords (Aho-Corasick if available)"""
+    keywords = sorted(set(keywords), key=len, reverse=True)
+    if HAS_AHOCORASICK:
+        automaton = ahocorasick.Automaton()
+        for keyword in keywords:
+            automaton.add_word(keyword, keyword)
+        automaton.make_automaton()
+        return automaton
+    # Lookahead so overlapping keywords (e.g. "blood" and "damp") are all found
+    return re.compile(f"(?=({_trie_alternation(keywords)}))")
+
+
+def _iter_keywords(matcher, lowered: str):
+    """Yield (start, keyword) for every keyword occurrence, in text order"""
+    if HAS_AHOCORASICK:
+        hits = [(end - len(keyword) + 1, keyword) for end, keyword in matcher.iter(lowered)]
+        hits.sort()
+        return iter(hits)
+    return ((match.start(), match.group(1)) for match in matcher.finditer(lowered))
+
+
+def _verb_before(lowered: str, start: int, verbs: Tuple[str, ...]) -> Optional[str]:
+    """Return the verb and whitespace run ending at position start, if any"""
+    verb_end = start
+    while verb_end > 0 and lowered[verb_end - 1].isspace():
+        verb_end -= 1
+    if verb_end == start:
+        return None
+    for verb in verbs:
+        if lowered.endswith(verb, 0, verb_end):
+            return lowered[verb_end - len(verb):start]
+    return None
+
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def _lowered(text: str) -> str:
+    """text lowercased for case-insensitive scans; offsets match text"""
+    return text.translate(_CASELESS_FIXES).lower()
+
+
+def _word_set(lowered: str) -> FrozenSet[str]:
+    """\\w+ tokens of lowered text; a one-word term t matches \\bt\\b iff it is in the set"""
+    return frozenset(_WORD_RE.findall(lowered))
+
+
+_DOSHA_MATCHER = _build_keyword_matcher(_DOSHA_KEYWORDS)
+_TCM_ACTION_MATCHER = _build_keyword_matcher(
+    keyword for _, keywords in _TCM_ACTION_RULES for keyword in keywords)
 
 
 # ============================================================================
 # PARSER CLASSES
 # ============================================================================
 
+# Number of distinct texts whose parsed properties each parser keeps
+PARSE_CACHE_SIZE = 128
+
+
+def _copy_properties(properties: dict) -> dict:
+    """Copy parsed properties so callers cannot modify a cached result"""
+    return {key: value.copy() if isinstance(value, (list, dict)) else value
+            for key, value in properties.items()}
+
+
+def _first_listed_match(regex: Pattern, values: Dict[str, str], text: str) -> Optional[str]:
+    """Value of the earliest-listed named group of regex that matches anywhere in text
+    
+    One scan replaces searching for each alternative in turn: a group listed
+    earlier in values wins even when a later one appears first in the text.
+    """
+    first = next(iter(values))
+    found = set()
+    for match in regex.finditer(text):
+        if match.lastgroup == first:
+            return values[first]
+        found.add(match.lastgroup)
+    for group, value in values.items():
+        if group in found:
+            return value
+    return None
+
+
 class AyurvedicParser:
     """Parser for Ayurvedic herbal medicine text"""
     
+    RASA_TERMS = ('Madhura', 'Sweet', 'Amla', 'Sour', 'Lavana', 'Salty',
+                  'Katu', 'Pungent', 'Tikta', 'Bitter', 'Kashaya', 'Astringent')
+    
+    # One alternation per property, matched against lowercased text; the
+    # first group listed in *_VALUES that is found anywhere in the text wins
+    VIRYA_RE = re.compile(
+        r'\b(?:(?P<ushna>ushna|heating|hot\s+potency)|(?P<shita>shita|cooling|cool\s+potency))\b')
+    VIRYA_VALUES = {'ushna': 'Ushna (heating)', 'shita': 'Shita (cooling)'}
+    VIPAKA_RE = re.compile(r'vipaka:\s*(?:(?P<madhura>madhura)|(?P<amla>amla)|(?P<katu>katu))')
+    VIPAKA_VALUES = {'madhura': 'Madhura (sweet)', 'amla': 'Amla (sour)', 'katu': 'Katu (pungent)'}
+    # Every VIRYA_RE match starts with one of these words
+    VIRYA_TRIGGERS = frozenset({'ushna', 'heating', 'hot', 'shita', 'cooling', 'cool'})
+    
     def __init__(self):
         self.herbs = AYURVEDIC_HERBS
         self.patterns = AYURVEDIC_PATTERNS
+        self.field_regex = AYURVEDIC_RE
+        # Memoized parse_text(); documents and windows are often parsed repeatedly
+        self._cached_parse_text = functools.lru_cache(maxsize=PARSE_CACHE_SIZE)(self._parse_text)
     
-    def _find_pattern_matches(self, pattern: str, text: str) -> list:
-        """Helper method to find all pattern matches in text"""
-        matches = re.finditer(pattern, text, re.IGNORECASE)
-        return [match.group(1).lower() for match in matches]
+    def parse_fields(self, text: str) -> Dict[str, List[str]]:
+        """Extract labeled fields (e.g. 'Rasa: ...') in a single pass over text"""
+        fields = defaultdict(list)
+        for match in self.field_regex.finditer(text):
+            fields[match.lastgroup].append(match.group(match.lastgroup).strip())
+        return dict(fields)
     
     def parse_dosha_effects(self, text: str) -> Dict[str, str]:
         """Extract dosha balancing/aggravating effects"""
-        dosha_effects = {}
-        
-        # Pattern for balances/pacifies
-        for pattern in [r'(?:Balances?|Pacifies?)\s+(Vata|Pitta|Kapha)', 
-                       r'(Vata|Pitta|Kapha)[- ](?:balancing|pacifying)']:
-            for dosha in self._find_pattern_matches(pattern, text):
-                dosha_effects[dosha] = 'pacifies'
+        return self._dosha_effects(_lowered(text))
+    
+    def _dosha_effects(self, lowered: str) -> Dict[str, str]:
+        # "Balances Vata", "Vata-balancing", "Aggravates Vata", "Vata-aggravating"
+        pacified, pacified_after, aggravated, aggravated_after = [], [], [], []
         
-        # Pattern for aggravates
-        for pattern in [r'(?:Aggravates?|Increases?)\s+(Vata|Pitta|Kapha)',
-                       r'(Vata|Pitta|Kapha)[- ](?:aggravating|increasing)']:
-            for dosha in self._find_pattern_matches(pattern, text):
-                dosha_effects[dosha] = 'aggravates'
+        for start, dosha in _iter_keywords(_DOSHA_MATCHER, lowered):
+            if _verb_before(lowered, start, _PACIFY_VERBS):
+                pacified.append(dosha)
+            elif _verb_before(lowered, start, _AGGRAVATE_VERBS):
+                aggravated.append(dosha)
+            
+            end = start + len(dosha)
+            if lowered[end:end + 1] in ('-', ' '):
+                if lowered.startswith(_PACIFY_SUFFIXES, end + 1):
+                    pacified_after.append(dosha)
+                elif lowered.startswith(_AGGRAVATE_SUFFIXES, end + 1):
+                    aggravated_after.append(dosha)
         
-        return dosha_effects
+        # Doshas keep the order they were first reported in; any aggravating
+        # mention takes precedence over a pacifying one
+        aggravating = set(aggravated).union(aggravated_after)
+        return {dosha: 'aggravates' if dosha in aggravating else 'pacifies'
+                for dosha in itertools.chain(pacified, pacified_after,
+                                             aggravated, aggravated_after)}
     
     def parse_rasa(self, text: str) -> List[str]:
         """Extract rasa (taste) information"""
-        rasas = []
-        rasa_terms = ['Madhura', 'Sweet', 'Amla', 'Sour', 'Lavana', 'Salty', 
-                      'Katu', 'Pungent', 'Tikta', 'Bitter', 'Kashaya', 'Astringent']
-        
-        for rasa in rasa_terms:
-            if re.search(rf'\b{rasa}\b', text, re.IGNORECASE):
-                if rasa not in rasas:
-                    rasas.append(rasa)
-        
-        return rasas
+        return self._rasa(_word_set(_lowered(text)))
+    
+    def _rasa(self, words: FrozenSet[str]) -> List[str]:
+        return [rasa for rasa in self.RASA_TERMS if rasa.lower() in words]
     
     def parse_virya(self, text: str) -> Optional[str]:
         """Extract virya (potency) information"""
-        if re.search(r'\b(?:Ushna|Heating|Hot\s+potency)\b', text, re.IGNORECASE):
-            return 'Ushna (heating)'
-        elif re.search(r'\b(?:Shita|Cooling|Cool\s+potency)\b', text, re.IGNORECASE):
-            return 'Shita (cooling)'
-        return None
+        lowered = _lowered(text)
+        return self._virya(lowered, _word_set(lowered))
+    
+    def _virya(self, lowered: str, words: FrozenSet[str]) -> Optional[str]:
+        # Skip the scan when no trigger word occurs
+        if words.isdisjoint(self.VIRYA_TRIGGERS):
+            return None
+        return _first_listed_match(self.VIRYA_RE, self.VIRYA_VALUES, lowered)
     
     def parse_vipaka(self, text: str) -> Optional[str]:
         """Extract vipaka (post-digestive effect) information"""
-        if re.search(r'Vipaka:\s*Madhura', text, re.IGNORECASE):
-            return 'Madhura (sweet)'
-        elif re.search(r'Vipaka:\s*Amla', text, re.IGNORECASE):
-            return 'Amla (sour)'
-        elif re.search(r'Vipaka:\s*Katu', text, re.IGNORECASE):
-            return 'Katu (pungent)'
-        return None
+        return self._vipaka(_lowered(text))
+    
+    def _vipaka(self, lowered: str) -> Optional[str]:
+        if 'vipaka:' not in lowered:
+            return None
+        return _first_listed_match(self.VIPAKA_RE, self.VIPAKA_VALUES, lowered)
+    
+    def parse_text(self, text: str) -> dict:
+        """Extract the Ayurvedic properties stated in text (the same for every herb)"""
+        return _copy_properties(self._cached_parse_text(text))
+    
+    def _parse_text(self, text: str) -> dict:
+        # Lowercased and tokenized once for all the property scans
+        lowered = _lowered(text)
+        words = _word_set(lowered)
+        return {
+            'doshas': self._dosha_effects(lowered),
+            'rasa': self._rasa(words),
+            'virya': self._virya(lowered, words),
+            'vipaka': self._vipaka(lowered),
+        }
+    
+    def herb_names(self, herb_name: str) -> dict:
+        """Sanskrit name of an Ayurvedic herb, if known"""
+        entry = self.herbs.get(herb_name)
+        return {'sanskrit_name': entry.sanskrit_name} if entry else {}
     
     def extract_ayurvedic_properties(self, text: str, herb_name: str) -> dict:
         """Extract all Ayurvedic properties from text"""
-        properties = {
-            'doshas': self.parse_dosha_effects(text),
-            'rasa': self.parse_rasa(text),
-            'virya': self.parse_virya(text),
-            'vipaka': self.parse_vipaka(text),
-        }
-        
-        # Add Sanskrit name if available
-        if herb_name in self.herbs:
-            properties['sanskrit_name'] = self.herbs[herb_name].get('sanskrit_name')
-        
+        properties = self.parse_text(text)
+        properties.update(self.herb_names(herb_name))
         return properties
 
 
 class TCMParser:
     """Parser for Traditional Chinese Medicine herbal text"""
     
+    CHANNEL_TERMS = ('Liver', 'Heart', 'Spleen', 'Lung', 'Kidney',
+                     'Stomach', 'Large Intestine', 'Small Intestine',
+                     'Bladder', 'Gallbladder', 'Pericardium', 'Triple Burner')
+    # Every channel name in one pass over lowercased text; group "c<i>" is CHANNEL_TERMS[i]
+    CHANNEL_NAME_RE = re.compile(
+        '|'.join(rf'(?P<c{i}>\b{re.escape(channel.lower())}\b)' for i, channel in enumerate(CHANNEL_TERMS)))
+    CHANNEL_WORD_RE = re.compile(r'channel|meridian')
+    
+    # Checked in order; the first temperature mentioned in this list wins
+    TEMPERATURE_TERMS = (
+        (frozenset({'hot', '热'}), 'Hot'),
+        (frozenset({'warm', '温'}), 'Warm'),
+        (frozenset({'neutral', '平'}), 'Neutral'),
+        (frozenset({'cool', '凉'}), 'Cool'),
+        (frozenset({'cold', '寒'}), 'Cold'),
+    )
+    TASTE_TERMS = ('Pungent', 'Sweet', 'Sour', 'Bitter', 'Salty', '辛', '甘', '酸', '苦', '咸')
+    
     def __init__(self):
         self.herbs = TCM_HERBS
         self.patterns = TCM_PATTERNS
+        self.field_regex = TCM_RE
+        # Memoized parse_text(); documents and windows are often parsed repeatedly
+        self._cached_parse_text = functools.lru_cache(maxsize=PARSE_CACHE_SIZE)(self._parse_text)
+    
+    def parse_fields(self, text: str) -> Dict[str, List[str]]:
+        """Extract labeled fields (e.g. 'Taste: ...') in a single pass over text"""
+        fields = defaultdict(list)
+        for match in self.field_regex.finditer(text):
+            fields[match.lastgroup].append(match.group(match.lastgroup).strip())
+        return dict(fields)
     
     def parse_channels(self, text: str) -> List[str]:
         """Extract channel/meridian affiliations"""
-        channels = []
-        channel_terms = ['Liver', 'Heart', 'Spleen', 'Lung', 'Kidney', 
-                        'Stomach', 'Large Intestine', 'Small Intestine',
-                        'Bladder', 'Gallbladder', 'Pericardium', 'Triple Burner']
-        
-        for channel in channel_terms:
-            if re.search(rf'\b{channel}\b.*(?:channel|meridian)', text, re.IGNORECASE):
-                if channel not in channels:
-                    channels.append(channel)
-        
-        return channels
+        return self._channels(_lowered(text))
+    
+    def _channels(self, lowered: str) -> List[str]:
+        # A channel counts when "channel"/"meridian" follows it on the same line
+        if 'channel' not in lowered and 'meridian' not in lowered:
+            return []
+        found = set()
+        for match in self.CHANNEL_NAME_RE.finditer(lowered):
+            channel = self.CHANNEL_TERMS[int(match.lastgroup[1:])]
+            if channel in found:
+                continue
+            line_end = lowered.find('\n', match.end())
+            if line_end == -1:
+                line_end = len(lowered)
+            if self.CHANNEL_WORD_RE.search(lowered, match.end(), line_end):
+                found.add(channel)
+        return [channel for channel in self.CHANNEL_TERMS if channel in found]
     
     def parse_temperature(self, text: str) -> Optional[str]:
         """Extract temperature property"""
-        temp_map = {
-            r'\b(?:Hot|热)\b': 'Hot',
-            r'\b(?:Warm|温)\b': 'Warm',
-            r'\b(?:Neutral|平)\b': 'Neutral',
-            r'\b(?:Cool|凉)\b': 'Cool',
-            r'\b(?:Cold|寒)\b': 'Cold'
-        }
-        
-        for pattern, temp in temp_map.items():
-            if re.search(pattern, text, re.IGNORECASE):
+        return self._temperature(_word_set(_lowered(text)))
+    
+    def _temperature(self, words: FrozenSet[str]) -> Optional[str]:
+        for terms, temp in self.TEMPERATURE_TERMS:
+            if not words.isdisjoint(terms):
                 return temp
         return None
     
     def parse_taste(self, text: str) -> List[str]:
         """Extract taste properties"""
-        tastes = []
-        taste_terms = ['Pungent', 'Sweet', 'Sour', 'Bitter', 'Salty', '辛', '甘', '酸', '苦', '咸']
-        
-        for taste in taste_terms:
-            if re.search(rf'\b{taste}\b', text, re.IGNORECASE):
-                if taste not in tastes:
-                    tastes.append(taste)
-        
-        return tastes
+        return self._taste(_word_set(_lowered(text)))
+    
+    def _taste(self, words: FrozenSet[str]) -> List[str]:
+        return [taste for taste in self.TASTE_TERMS if taste.lower() in words]
     
     def parse_actions(self, text: str) -> List[str]:
         """Extract TCM actions"""
-        actions = []
-        action_patterns = [
-            r'Tonif(?:y|ies)\s+(?:Qi|Blood|Yin|Yang)',
-            r'Clears?\s+(?:Heat|Damp|Phlegm|Wind)',
-            r'Moves?\s+(?:Qi|Blood)',
-            r'Transforms?\s+Phlegm',
-            r'Nourishes?\s+(?:Blood|Yin)',
-        ]
+        return self._actions(text, _lowered(text))
+    
+    def _actions(self, text: str, lowered: str) -> List[str]:
+        # e.g. "Tonifies Qi", "Clears Heat"; grouped by action in rule order
+        found = [[] for _ in _TCM_ACTION_RULES]
         
-        for pattern in action_patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                action = match.group(0)
-                if action not in actions:
-                    actions.append(action)
+        for start, keyword in _iter_keywords(_TCM_ACTION_MATCHER, lowered):
+            for rule_found, (verbs, keywords) in zip(found, _TCM_ACTION_RULES):
+                if keyword in keywords:
+                    verb = _verb_before(lowered, start, verbs)
+                    if verb:
+                        rule_found.append(text[start - len(verb):start + len(keyword)])
         
-        return actions
+        # dict.fromkeys drops repeats while keeping first-seen order
+        return list(dict.fromkeys(itertools.chain.from_iterable(found)))
+    
+    def parse_text(self, text: str) -> dict:
+        """Extract the TCM properties stated in text (the same for every herb)"""
+        return _copy_properties(self._cached_parse_text(text))
+    
+    def _parse_text(self, text: str) -> dict:
+        # Lowercased and tokenized once for all the property scans
+        lowered = _lowered(text)
+        words = _word_set(lowered)
+        return {
+            'channels': self._channels(lowered),
+            'tcm_temperature': self._temperature(words),
+            'tcm_taste': self._taste(words),
+            'tcm_actions': self._actions(text, lowered),
+        }
+    
+    def herb_names(self, herb_name: str) -> dict:
+        """Pinyin and Chinese names of a TCM herb, if known"""
+        entry = self.herbs.get(herb_name)
+        if not entry:
+            return {}
+        return {'pinyin_name': entry.pinyin_name, 'chinese_name': entry.chinese_name}
     
     def extract_tcm_properties(self, text: str, herb_name: str) -> dict:
         """Extract all TCM properties from text"""
-        properties = {
-            'channels': self.parse_channels(text),
-            'tcm_temperature': self.parse_temperature(text),
-            'tcm_taste': self.parse_taste(text),
-            'tcm_actions': self.parse_actions(text),
-        }
-        
-        # Add Pinyin and Chinese names if available
-        if herb_name in self.herbs:
-            properties['pinyin_name'] = self.herbs[herb_name].get('pinyin_name')
-            properties['chinese_name'] = self.herbs[herb_name].get('chinese_name')
-        
+        properties = self.parse_text(text)
+        properties.update(self.herb_names(herb_name))
         return properties
 
 
@@ -1074,9 +1543,25 @@ class TCMParser:
 # MAIN PDF PROCESSOR
 # ============================================================================
 
+# One generated apothecary.py substance definition (see generate_apothecary_code)
+_SUBSTANCE_CODE_TEMPLATE = (
+    'self._add_substance(Substance(\n'
+    '    name="{name}",\n'
+    '    category="herb",\n'
+    '    common_names={common_names},\n'
+    '    primary_effects=[],  # TODO: Add effects\n'
+    '    description="{description}"\n'
+    '))\n'
+)
+
+
 class PDFProcessor:
     """Main PDF processing class for herb extraction"""
     
+    # Characters of context either side of a herb mention (widened to whole
+    # lines) that its tradition-specific properties are read from
+    CONTEXT_CHARS = 500
+    
     def __init__(self):
         self.known_herbs = KNOWN_HERBS
         self.ayurvedic_herbs = AYURVEDIC_HERBS
@@ -1086,14 +1571,36 @@ class PDFProcessor:
         
         # Merge all herbs with cross-referencing
         self.all_herbs = self._merge_herb_dictionaries()
+        
+        # Multi-pattern matcher over every herb name, built once
+        self._herb_matcher = self._build_herb_matcher()
+        self._herb_order = {name: index for index, name in enumerate(self.all_herbs)}
+        # name -> (scientific name, common names, tradition) as reported for each hit
+        self._herb_meta = {
+            name: (data.get('scientific_name'), tuple(data.get('common_names', ())),
+                   data.get('tradition', 'western'))
+            for name, data in self.all_herbs.items()
+        }
+        
+        # tradition -> property extractors to run for herbs of that tradition
+        self._property_extractors = {
+            'western': (),
+            'ayurvedic': (self._ayurvedic_fields,),
+            'tcm': (self._tcm_fields,),
+            'mixed': (self._ayurvedic_fields, self._tcm_fields),
+        }
     
     def _merge_herb_dictionaries(self) -> Dict[str, dict]:
         """Merge all herb dictionaries, avoiding duplicates and cross-referencing"""
         merged = {}
+        # species id -> first merged entry of that species
+        species_index = {}
         
         # Add Western herbs
         for name, data in self.known_herbs.items():
             merged[name] = data.copy()
+            if data.species_id is not None:
+                species_index.setdefault(data.species_id, name)
         
         # Add Ayurvedic herbs (check for cross-references)
         for name, data in self.ayurvedic_herbs.items():
@@ -1103,73 +1610,218 @@ class PDFProcessor:
                 merged[name]['sanskrit_name'] = data.get('sanskrit_name')
             else:
                 merged[name] = data.copy()
+                if data.species_id is not None:
+                    species_index.setdefault(data.species_id, name)
         
         # Add TCM herbs (check for cross-references)
         for name, data in self.tcm_herbs.items():
-            # Check by scientific name for cross-references
-            found = False
-            for existing_name, existing_data in merged.items():
-                if existing_data.get('scientific_name') == data.get('scientific_name'):
-                    # Cross-reference found
-                    merged[existing_name]['tradition'] = 'mixed'
-                    merged[existing_name]['pinyin_name'] = data.get('pinyin_name')
-                    merged[existing_name]['chinese_name'] = data.get('chinese_name')
-                    # Add TCM name as common name
-                    if name not in merged[existing_name].get('common_names', []):
-                        merged[existing_name].setdefault('common_names', []).append(name)
-                    found = True
-                    break
-            
-            if not found:
+            # Check by species (scientific name) for cross-references
+            existing_name = species_index.get(data.species_id)
+            if existing_name is not None:
+                # Cross-reference found
+                merged[existing_name]['tradition'] = 'mixed'
+                merged[existing_name]['pinyin_name'] = data.get('pinyin_name')
+                merged[existing_name]['chinese_name'] = data.get('chinese_name')
+                # Add TCM name as common name
+                common_names = merged[existing_name].get('common_names', ())
+                if name not in common_names:
+                    merged[existing_name]['common_names'] = (*common_names, name)
+            else:
                 merged[name] = data.copy()
+                if data.species_id is not None:
+                    species_index.setdefault(data.species_id, name)
         
         return merged
     
+    def _build_herb_matcher(self):
+        """Build a single matcher for all herb names (Aho-Corasick if available)"""
+        if HAS_AHOCORASICK:
+            automaton = ahocorasick.Automaton()
+            for herb_name in self.all_herbs:
+                lowered = herb_name.lower()
+                automaton.add_word(lowered, (herb_name, len(lowered)))
+            automaton.make_automaton()
+            return automaton
+        
+        # Fallback: one alternation inside a lookahead so overlapping names
+        # (e.g. "Di Huang" inside "Shu Di Huang") are all reported
+        self._herb_names_lower = {name.lower(): name for name in self.all_herbs}
+        return re.compile(rf'(?=\b({_trie_alternation(self._herb_names_lower)})\b)')
+    
+    @staticmethod
+    def _is_word_char(char: str) -> bool:
+        """Whether char is a regex \\w character"""
+        return char.isalnum() or char == '_'
+    
+    def _find_herb_spans(self, text: str) -> Dict[str, List[Tuple[int, int]]]:
+        """Return the (start, end) offsets of each known herb mentioned in text"""
+        found = defaultdict(list)
+        if HAS_AHOCORASICK:
+            # Same length as text, so offsets also index the original text
+            lowered = _lowered(text)
+            last = len(lowered) - 1
+            is_word_char = self._is_word_char
+            # Herb names start and end with word characters, so \b on either
+            # side only depends on the neighbouring character outside the hit
+            for end, (herb_name, length) in self._herb_matcher.iter(lowered):
+                start = end - length + 1
+                if start > 0 and is_word_char(lowered[start - 1]):
+                    continue
+                if end < last and is_word_char(lowered[end + 1]):
+                    continue
+                found[herb_name].append((start, end + 1))
+            return found
+        
+        for match in self._herb_matcher.finditer(_lowered(text)):
+            herb_name = self._herb_names_lower[match.group(1)]
+            found[herb_name].append(match.span(1))
+        return found
+    
+    def _context_windows(self, text: str, spans: List[Tuple[int, int]]) -> Tuple[Tuple[int, int], ...]:
+        """Whole-line windows of CONTEXT_CHARS around each span, merged where they overlap"""
+        windows = []
+        for start, end in spans:
+            start = text.rfind('\n', 0, max(0, start - self.CONTEXT_CHARS)) + 1
+            end = text.find('\n', end + self.CONTEXT_CHARS)
+            if end == -1:
+                end = len(text)
+            if windows and start <= windows[-1][1]:
+                windows[-1] = (windows[-1][0], max(end, windows[-1][1]))
+            else:
+                windows.append((start, end))
+        return tuple(windows)
+    
+    @staticmethod
+    def _context_properties(parser, text: str, windows: Tuple[Tuple[int, int], ...],
+                            parsed: dict) -> dict:
+        """Parse a tradition's properties from the text in windows, once per context"""
+        key = (parser, windows)
+        if key not in parsed:
+            parsed[key] = parser.parse_text('\n'.join(text[start:end] for start, end in windows))
+        return parsed[key]
+    
     def extract_herbs_from_text(self, text: str, source_doc: str = "") -> List[ExtractedHerb]:
         """Extract herbs from text content"""
         extracted_herbs = []
+        herb_spans = self._find_herb_spans(text)
+        # (parser, windows) -> parsed properties, shared by herbs with the same context
+        parsed = {}
         
-        for herb_name, herb_data in self.all_herbs.items():
-            # Simple pattern matching for herb names
-            pattern = rf'\b{re.escape(herb_name)}\b'
-            if re.search(pattern, text, re.IGNORECASE):
-                herb = ExtractedHerb(
-                    name=herb_name,
-                    scientific_name=herb_data.get('scientific_name'),
-                    common_names=herb_data.get('common_names', []),
-                    source_document=source_doc,
-                    tradition=herb_data.get('tradition', 'western')
-                )
-                
-                # Extract tradition-specific properties
-                tradition = herb_data.get('tradition', 'western')
-                
-                if tradition in ['ayurvedic', 'mixed']:
-                    ayur_props = self.ayurvedic_parser.extract_ayurvedic_properties(text, herb_name)
-                    herb.sanskrit_name = ayur_props.get('sanskrit_name')
-                    herb.doshas = ayur_props.get('doshas', {})
-                    herb.rasa = ayur_props.get('rasa', [])
-                    herb.virya = ayur_props.get('virya')
-                    herb.vipaka = ayur_props.get('vipaka')
-                
-                if tradition in ['tcm', 'mixed']:
-                    tcm_props = self.tcm_parser.extract_tcm_properties(text, herb_name)
-                    herb.pinyin_name = tcm_props.get('pinyin_name')
-                    herb.chinese_name = tcm_props.get('chinese_name')
-                    herb.channels = tcm_props.get('channels', [])
-                    herb.tcm_temperature = tcm_props.get('tcm_temperature')
-                    herb.tcm_taste = tcm_props.get('tcm_taste', [])
-                    herb.tcm_actions = tcm_props.get('tcm_actions', [])
-                
-                extracted_herbs.append(herb)
+        # Report found herbs in database order so results stay deterministic
+        for herb_name in sorted(herb_spans, key=self._herb_order.__getitem__):
+            scientific_name, common_names, tradition = self._herb_meta[herb_name]
+            fields = {}
+            # Tradition-specific properties; western herbs have none
+            extractors = self._property_extractors.get(tradition, ())
+            if extractors:
+                # Only the text around a herb's mentions describes that herb
+                windows = self._context_windows(text, herb_spans[herb_name])
+                for extract in extractors:
+                    fields.update(extract(herb_name, text, windows, parsed))
+            
+            # Built in one call, so no default containers are made and discarded
+            extracted_herbs.append(ExtractedHerb(
+                name=herb_name,
+                scientific_name=scientific_name,
+                common_names=list(common_names),
+                source_document=source_doc,
+                tradition=tradition,
+                **fields
+            ))
         
         return extracted_herbs
     
-    def export_to_json(self, herbs: List[ExtractedHerb], filepath: str):
-        """Export extracted herbs to JSON file"""
+    def extract_herbs_by_tradition(self, text: str, source_doc: str = "") -> Dict[str, List[ExtractedHerb]]:
+        """Extract herbs from text, grouped by tradition (database order within each group)"""
+        by_tradition = defaultdict(list)
+        for herb in self.extract_herbs_from_text(text, source_doc):
+            by_tradition[herb.tradition].append(herb)
+        return dict(by_tradition)
+    
+    def _ayurvedic_fields(self, herb_name: str, text: str,
+                          windows: Tuple[Tuple[int, int], ...], parsed: dict) -> dict:
+        """ExtractedHerb fields for a herb's Ayurvedic names and properties"""
+        ayur_props = self._context_properties(self.ayurvedic_parser, text, windows, parsed)
+        return {
+            'sanskrit_name': self.ayurvedic_parser.herb_names(herb_name).get('sanskrit_name'),
+            'doshas': dict(ayur_props['doshas']),
+            'rasa': list(ayur_props['rasa']),
+            'virya': ayur_props['virya'],
+            'vipaka': ayur_props['vipaka'],
+        }
+    
+    def _tcm_fields(self, herb_name: str, text: str,
+                    windows: Tuple[Tuple[int, int], ...], parsed: dict) -> dict:
+        """ExtractedHerb fields for a herb's TCM names and properties"""
+        tcm_props = self._context_properties(self.tcm_parser, text, windows, parsed)
+        tcm_names = self.tcm_parser.herb_names(herb_name)
+        return {
+            'pinyin_name': tcm_names.get('pinyin_name'),
+            'chinese_name': tcm_names.get('chinese_name'),
+            'channels': list(tcm_props['channels']),
+            'tcm_temperature': tcm_props['tcm_temperature'],
+            'tcm_taste': list(tcm_props['tcm_taste']),
+            'tcm_actions': list(tcm_props['tcm_actions']),
+        }
+    
+    def extract_herbs_from_documents(self, documents: Iterable[Tuple[str, str]],
+                                     max_workers: Optional[int] = None) -> List[List[ExtractedHerb]]:
+        """Extract herbs from (source_doc, text) pairs in parallel worker processes
+        
+        Results are returned in input order. On Linux, workers are forked and
+        reuse this processor; elsewhere each builds its own PDFProcessor once.
+        With a single document or worker, runs in-process.
+        """
+        documents = list(documents)
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        # Workers beyond one per document would only sit idle
+        max_workers = min(max_workers, len(documents))
+        if len(documents) <= 1 or max_workers <= 1:
+            return [self.extract_herbs_from_text(text, source_doc) for source_doc, text in documents]
+        
+        if _FORK_CONTEXT is not None:
+            # Not pickled: forked workers start with this very processor
+            pool_options = {'mp_context': _FORK_CONTEXT, 'initargs': (self,)}
+        else:
+            pool_options = {}
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_extraction_worker,
+                                 **pool_options) as executor:
+            # Deal the texts, longest first, round-robin into batches: every
+            # batch gets a share of the large documents, so no worker is left
+            # running the longest ones back to back while the others sit idle
+            order = sorted(range(len(documents)), key=lambda i: len(documents[i][1]), reverse=True)
+            batch_size = max(1, len(documents) // (max_workers * 4))
+            batch_count = -(-len(documents) // batch_size)
+            batches = [order[start::batch_count] for start in range(batch_count)]
+            results = [None] * len(documents)
+            extracted = executor.map(_extract_documents,
+                                     [[documents[i] for i in batch] for batch in batches])
+            for batch, batch_herbs in zip(batches, extracted):
+                for index, herbs in zip(batch, batch_herbs):
+                    results[index] = herbs
+            return results
+    
+    def export_to_json(self, herbs: List[ExtractedHerb], filepath):
+        """Export extracted herbs to a JSON file path or an open text file"""
         herbs_dict = [herb.to_dict() for herb in herbs]
+        if HAS_ORJSON:
+            # Same layout as json's indent=2 output, encoded in C
+            data = orjson.dumps(herbs_dict, option=orjson.OPT_INDENT_2)
+            if hasattr(filepath, 'write'):
+                filepath.write(data.decode('utf-8'))
+                return
+            with open(filepath, 'wb') as f:
+                f.write(data)
+            return
+        
+        # json.dump would write each small encoder chunk separately
+        data = json.dumps(herbs_dict, indent=2, ensure_ascii=False)
+        if hasattr(filepath, 'write'):
+            filepath.write(data)
+            return
         with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(herbs_dict, f, indent=2, ensure_ascii=False)
+            f.write(data)
     
     def generate_apothecary_code(self, herbs: List[ExtractedHerb]) -> str:
         """Generate Python code for apothecary.py integration"""
@@ -1182,10 +1834,6 @@ class PDFProcessor:
         ]
         
         for herb in herbs:
-            code_lines.append(f"self._add_substance(Substance(")
-            code_lines.append(f'    name="{herb.name}",')
-            code_lines.append(f'    category="herb",')
-            
             # Build common names list
             common_names = [herb.name.lower()]
             if herb.common_names:
@@ -1195,9 +1843,8 @@ class PDFProcessor:
                 common_names.append(f"{herb.sanskrit_name}")
             if herb.pinyin_name:
                 common_names.append(herb.pinyin_name.lower())
-            
-            code_lines.append(f'    common_names={common_names},')
-            code_lines.append(f'    primary_effects=[],  # TODO: Add effects')
+            # dict.fromkeys drops repeats while keeping first-seen order
+            common_names = list(dict.fromkeys(common_names))
             
             # Build description
             desc_parts = []
@@ -1207,24 +1854,44 @@ class PDFProcessor:
                 desc_parts.append(f"{herb.tradition.title()} herb")
             description = f"{herb.name} " + " - ".join(desc_parts) if desc_parts else herb.name
             
-            code_lines.append(f'    description="{description}"')
-            code_lines.append(f"))")
-            code_lines.append("")
+            code_lines.append(_SUBSTANCE_CODE_TEMPLATE.format(
+                name=herb.name, common_names=common_names, description=description))
         
         return "\n".join(code_lines)
     
     def get_herb_statistics(self) -> dict:
         """Get statistics about the herb database"""
+        traditions = Counter(h.get('tradition') for h in self.all_herbs.values())
         stats = {
             'total_herbs': len(self.all_herbs),
-            'western_herbs': sum(1 for h in self.all_herbs.values() if h.get('tradition') == 'western'),
-            'ayurvedic_herbs': sum(1 for h in self.all_herbs.values() if h.get('tradition') == 'ayurvedic'),
-            'tcm_herbs': sum(1 for h in self.all_herbs.values() if h.get('tradition') == 'tcm'),
-            'mixed_tradition': sum(1 for h in self.all_herbs.values() if h.get('tradition') == 'mixed'),
+            'western_herbs': traditions['western'],
+            'ayurvedic_herbs': traditions['ayurvedic'],
+            'tcm_herbs': traditions['tcm'],
+            'mixed_tradition': traditions['mixed'],
         }
         return stats
 
 
+# Per-process PDFProcessor used by extract_herbs_from_documents() workers
+_worker_processor: Optional[PDFProcessor] = None
+
+# Forked workers inherit the parent's processor (matchers, caches) copy-on-write;
+# elsewhere fork is unavailable or unsafe and workers build their own
+_FORK_CONTEXT = multiprocessing.get_context('fork') if sys.platform == 'linux' else None
+
+
+def _init_extraction_worker(processor: Optional[PDFProcessor] = None):
+    """Set up the worker's PDFProcessor once, instead of once per document"""
+    global _worker_processor
+    _worker_processor = processor if processor is not None else PDFProcessor()
+
+
+def _extract_documents(documents: List[Tuple[str, str]]) -> List[List[ExtractedHerb]]:
+    """Extract herbs from a batch of (source_doc, text) pairs in a worker process"""
+    return [_worker_processor.extract_herbs_from_text(text, source_doc)
+            for source_doc, text in documents]
+
+
 # ============================================================================
 # EXAMPLE USAGE
 # ============================================================================
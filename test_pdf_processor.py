@@ -8,10 +8,13 @@ Validates herb recognition, parsing, and data extraction functionality
 import unittest
 import json
 import os
+import re
 from pdf_processor import (
     PDFProcessor, AyurvedicParser, TCMParser, ExtractedHerb,
     KNOWN_HERBS, AYURVEDIC_HERBS, TCM_HERBS,
-    AYURVEDIC_PATTERNS, TCM_PATTERNS
+    AYURVEDIC_PATTERNS, TCM_PATTERNS, AYURVEDIC_FIELDS, TCM_FIELDS,
+    lookup_herb, classify_tokens, suggest_herbs, herbs_of, same_species,
+    is_common_name, HERB_BY_ID, HERB_ID
 )
 
 
@@ -33,30 +36,89 @@ class TestHerbDictionaries(unittest.TestCase):
         self.assertGreaterEqual(len(TCM_HERBS), 39,  # Close enough to 40
                                f"TCM_HERBS should have around 40 herbs, found {len(TCM_HERBS)}")
     
+    def assertEntriesHave(self, herbs, required, tradition):
+        """Assert every entry has the required fields and the given tradition"""
+        missing = {name: sorted(required - data.keys())
+                   for name, data in herbs.items() if not required <= data.keys()}
+        self.assertFalse(missing, f"herbs missing fields: {missing}")
+        wrong = [name for name, data in herbs.items() if data['tradition'] != tradition]
+        self.assertFalse(wrong, f"herbs not marked {tradition}: {wrong}")
+    
     def test_known_herbs_structure(self):
         """Verify KNOWN_HERBS entries have required fields"""
-        for name, data in KNOWN_HERBS.items():
-            self.assertIn('scientific_name', data, f"{name} missing scientific_name")
-            self.assertIn('common_names', data, f"{name} missing common_names")
-            self.assertIn('tradition', data, f"{name} missing tradition")
-            self.assertEqual(data['tradition'], 'western')
+        self.assertEntriesHave(KNOWN_HERBS, {'scientific_name', 'common_names', 'tradition'},
+                               'western')
     
     def test_ayurvedic_herbs_structure(self):
         """Verify AYURVEDIC_HERBS entries have required fields"""
-        for name, data in AYURVEDIC_HERBS.items():
-            self.assertIn('scientific_name', data, f"{name} missing scientific_name")
-            self.assertIn('sanskrit_name', data, f"{name} missing sanskrit_name")
-            self.assertIn('tradition', data, f"{name} missing tradition")
-            self.assertEqual(data['tradition'], 'ayurvedic')
+        self.assertEntriesHave(AYURVEDIC_HERBS, {'scientific_name', 'sanskrit_name', 'tradition'},
+                               'ayurvedic')
     
     def test_tcm_herbs_structure(self):
         """Verify TCM_HERBS entries have required fields"""
-        for name, data in TCM_HERBS.items():
-            self.assertIn('scientific_name', data, f"{name} missing scientific_name")
-            self.assertIn('pinyin_name', data, f"{name} missing pinyin_name")
-            self.assertIn('chinese_name', data, f"{name} missing chinese_name")
-            self.assertIn('tradition', data, f"{name} missing tradition")
-            self.assertEqual(data['tradition'], 'tcm')
+        self.assertEntriesHave(TCM_HERBS, {'scientific_name', 'pinyin_name', 'chinese_name', 'tradition'},
+                               'tcm')
+    
+    def test_herb_dictionaries_read_only(self):
+        """Verify the herb dictionaries cannot be modified, even by merging"""
+        with self.assertRaises(TypeError):
+            KNOWN_HERBS['Test Herb'] = {}
+        with self.assertRaises(TypeError):
+            TCM_HERBS['Huang Qi']['tradition'] = 'western'
+        self.assertIsInstance(AYURVEDIC_HERBS['Ashwagandha']['common_names'], tuple)
+        record = TCM_HERBS['Huang Qi']
+        self.assertEqual(record.chinese_name, "黄芪")
+        self.assertEqual(record.get('chinese_name'), "黄芪")
+        self.assertNotIn('sanskrit_name', record)
+        self.assertEqual(record.copy()['tradition'], 'tcm')
+        processor = PDFProcessor()
+        self.assertEqual(processor.all_herbs['Astragalus']['tradition'], 'mixed')
+        self.assertEqual(KNOWN_HERBS['Astragalus']['tradition'], 'western')
+    
+    def test_herbs_of_tradition(self):
+        """Verify tradition-scoped access to the herb dictionaries"""
+        self.assertIs(herbs_of('tcm'), TCM_HERBS)
+        self.assertIs(herbs_of('Ayurvedic'), AYURVEDIC_HERBS)
+        with self.assertRaises(ValueError):
+            herbs_of('unani')
+    
+    def test_same_species_across_traditions(self):
+        """Verify entries for one species are linked across traditions"""
+        self.assertTrue(same_species(KNOWN_HERBS['Ginseng'], TCM_HERBS['Ren Shen']))
+        self.assertFalse(same_species(KNOWN_HERBS['Ginseng'], TCM_HERBS['Huang Qi']))
+        # Formulas share a placeholder scientific name but are not one species
+        self.assertFalse(same_species(AYURVEDIC_HERBS['Triphala'], AYURVEDIC_HERBS['Trikatu']))
+    
+    def test_record_mapping_keys(self):
+        """Verify records and merged entries expose only the original entry keys"""
+        self.assertEqual(set(dict(KNOWN_HERBS['Kava'])),
+                         {'scientific_name', 'common_names', 'tradition'})
+        self.assertEqual(set(KNOWN_HERBS['Kava'].copy()), set(KNOWN_HERBS['Kava'].keys()))
+        self.assertEqual(set(dict(TCM_HERBS['Huang Qi'])),
+                         {'scientific_name', 'pinyin_name', 'chinese_name', 'common_names', 'tradition'})
+        merged = PDFProcessor().all_herbs
+        self.assertNotIn('species_id', merged['Kava'])
+        self.assertNotIn('species_id', merged['Ginseng'])
+    
+    def test_common_name_membership(self):
+        """Verify case-insensitive common-name tests per herb and across herbs"""
+        self.assertTrue(AYURVEDIC_HERBS['Ashwagandha'].has_common_name('winter CHERRY'))
+        self.assertFalse(AYURVEDIC_HERBS['Ashwagandha'].has_common_name('Ashwagandha'))
+        self.assertTrue(is_common_name(' Milk Vetch '))
+        self.assertFalse(is_common_name('aspirin'))
+    
+    def test_herb_ids(self):
+        """Verify every herb has a stable integer id"""
+        self.assertEqual(len(HERB_BY_ID),
+                         len(KNOWN_HERBS) + len(AYURVEDIC_HERBS) + len(TCM_HERBS))
+        self.assertEqual(HERB_ID[HERB_BY_ID[0]], 0)
+        self.assertEqual(HERB_BY_ID[HERB_ID['Huang Qi']], 'Huang Qi')
+    
+    def test_herb_names_bounded_by_word_characters(self):
+        """Verify herb names start and end with word characters (herb matching relies on it)"""
+        for herbs in (KNOWN_HERBS, AYURVEDIC_HERBS, TCM_HERBS):
+            for name in herbs:
+                self.assertRegex(name, r'^\w(.*\w)?$')
     
     def test_specific_western_herbs(self):
         """Verify specific Western herbs are included"""
@@ -80,6 +142,55 @@ class TestHerbDictionaries(unittest.TestCase):
             self.assertIn(herb, TCM_HERBS, f"{herb} should be in TCM_HERBS")
 
 
+class TestHerbLookup(unittest.TestCase):
+    """Test alias-based herb lookup"""
+    
+    def test_lookup_by_canonical_name(self):
+        """Test lookup by canonical name, ignoring case"""
+        name, entry = lookup_herb("ashwagandha")
+        self.assertEqual(name, "Ashwagandha")
+        self.assertEqual(entry['scientific_name'], "Withania somnifera")
+    
+    def test_lookup_by_alias(self):
+        """Test lookup by common, scientific, Pinyin and script names"""
+        self.assertEqual(lookup_herb("Winter Cherry")[0], "Ashwagandha")
+        self.assertEqual(lookup_herb("Withania somnifera")[0], "Ashwagandha")
+        self.assertEqual(lookup_herb("Huáng Qí")[0], "Huang Qi")
+        self.assertEqual(lookup_herb("黄芪")[0], "Huang Qi")
+        self.assertEqual(lookup_herb("अश्वगंधा")[0], "Ashwagandha")
+    
+    def test_lookup_unknown(self):
+        """Test that unknown or non-specific names are not found"""
+        self.assertIsNone(lookup_herb("Not A Herb"))
+        self.assertIsNone(lookup_herb("Combination formula"))
+    
+    def test_classify_tokens(self):
+        """Test batch classification of candidate tokens"""
+        tokens = ["Tulsi", "aspirin", "Ren Shen", " ginger ", "Sacred Basil"]
+        self.assertEqual(classify_tokens(tokens),
+                         ["Tulsi", None, "Ren Shen", "Ginger", "Holy Basil"])
+    
+    def test_lookup_canonical_names_resolve_to_themselves(self):
+        """Verify no herb's alias shadows another herb's canonical name"""
+        for herbs in (KNOWN_HERBS, AYURVEDIC_HERBS, TCM_HERBS):
+            for name in herbs:
+                self.assertEqual(lookup_herb(name)[0], name)
+        self.assertIs(lookup_herb("Huang Qi")[1], TCM_HERBS["Huang Qi"])
+        self.assertIn('sanskrit_name', lookup_herb("Tulsi")[1])
+    
+    def test_suggest_herbs(self):
+        """Test prefix completion and typo suggestions"""
+        self.assertEqual(suggest_herbs("gin"), ["Ginger", "Ginkgo Biloba", "Ginseng"])
+        self.assertEqual(suggest_herbs("ashwaganda"), ["Ashwagandha"])
+        self.assertEqual(suggest_herbs("zzz"), [])
+    
+    def test_suggest_herbs_other_traditions(self):
+        """Test TCM and Ayurvedic name prefixes suggest their own herbs"""
+        self.assertIn("Huang Qi", suggest_herbs("huang"))
+        self.assertNotIn("Astragalus", suggest_herbs("huang"))
+        self.assertEqual(suggest_herbs("gokshu"), ["Gokshura"])
+
+
 class TestExtractedHerbDataclass(unittest.TestCase):
     """Test ExtractedHerb dataclass"""
     
@@ -133,13 +244,27 @@ class TestExtractedHerbDataclass(unittest.TestCase):
         self.assertIsInstance(herb_dict, dict)
         self.assertEqual(herb_dict['name'], "Test")
         self.assertEqual(herb_dict['scientific_name'], "Testus herbicus")
+    
+    def test_to_dict_copies_containers(self):
+        """Test that to_dict does not share lists or dicts with the herb"""
+        herb = ExtractedHerb(
+            name="Test",
+            common_names=["Common Test"],
+            doshas={'vata': 'pacifies'}
+        )
+        herb_dict = herb.to_dict()
+        herb_dict['common_names'].append("Other")
+        herb_dict['doshas']['pitta'] = 'aggravates'
+        self.assertEqual(herb.common_names, ["Common Test"])
+        self.assertEqual(herb.doshas, {'vata': 'pacifies'})
 
 
 class TestAyurvedicParser(unittest.TestCase):
     """Test AyurvedicParser functionality"""
     
-    def setUp(self):
-        self.parser = AyurvedicParser()
+    @classmethod
+    def setUpClass(cls):
+        cls.parser = AyurvedicParser()
     
     def test_parse_dosha_effects_balances(self):
         """Test parsing of dosha balancing effects"""
@@ -177,6 +302,17 @@ class TestAyurvedicParser(unittest.TestCase):
         virya = self.parser.parse_virya(text)
         self.assertEqual(virya, 'Shita (cooling)')
     
+    def test_parse_virya_heating_takes_precedence(self):
+        """Test heating virya wins over cooling wherever it appears"""
+        text = "Cooling to the touch, but Ushna in potency"
+        self.assertEqual(self.parser.parse_virya(text), 'Ushna (heating)')
+    
+    def test_parse_vipaka(self):
+        """Test parsing of vipaka"""
+        self.assertEqual(self.parser.parse_vipaka("Vipaka: Katu"), 'Katu (pungent)')
+        self.assertEqual(self.parser.parse_vipaka("Vipaka: Amla. Vipaka: Madhura"), 'Madhura (sweet)')
+        self.assertIsNone(self.parser.parse_vipaka("Rasa: Katu"))
+    
     def test_extract_ayurvedic_properties(self):
         """Test complete Ayurvedic property extraction"""
         text = """
@@ -190,13 +326,32 @@ class TestAyurvedicParser(unittest.TestCase):
         self.assertIn('Bitter', props['rasa'])
         self.assertEqual(props['virya'], 'Ushna (heating)')
         self.assertEqual(props['sanskrit_name'], "अश्वगंधा")
+    
+    def test_parse_text_cached_result_not_shared(self):
+        """Test that repeated parses return equal but independent results"""
+        text = "Balances Vata. Rasa: Tikta"
+        first = self.parser.parse_text(text)
+        first['doshas']['kapha'] = 'aggravates'
+        first['rasa'].append('Madhura')
+        second = self.parser.parse_text(text)
+        self.assertEqual(second['doshas'], {'vata': 'pacifies'})
+        self.assertEqual(second['rasa'], ['Tikta'])
+    
+    def test_parse_fields_line_anchored(self):
+        """Test that labeled fields are only read at the start of a line"""
+        text = "  Rasa: Tikta, Kashaya\nSee also Virya: Ushna\nPacifies Kapha"
+        fields = self.parser.parse_fields(text)
+        self.assertEqual(fields['rasa'], ['Tikta, Kashaya'])
+        self.assertNotIn('virya', fields)
+        self.assertEqual(fields['pacifies'], ['Kapha'])
 
 
 class TestTCMParser(unittest.TestCase):
     """Test TCMParser functionality"""
     
-    def setUp(self):
-        self.parser = TCMParser()
+    @classmethod
+    def setUpClass(cls):
+        cls.parser = TCMParser()
     
     def test_parse_channels(self):
         """Test parsing of channel affiliations"""
@@ -245,13 +400,24 @@ class TestTCMParser(unittest.TestCase):
         self.assertIn('Sweet', props['tcm_taste'])
         self.assertEqual(props['pinyin_name'], "Huáng Qí")
         self.assertEqual(props['chinese_name'], "黄芪")
+    
+    def test_parse_fields(self):
+        """Test single-pass extraction of labeled TCM fields"""
+        text = "Temperature: Warm\nTaste: Sweet\nTonifies Qi. Enters the Liver."
+        fields = self.parser.parse_fields(text)
+        self.assertEqual(fields['temperature'], ['Warm'])
+        self.assertEqual(fields['taste'], ['Sweet'])
+        self.assertEqual(fields['tonifies'], ['Qi'])
+        self.assertEqual(fields['enters'], ['Liver'])
 
 
 class TestPDFProcessor(unittest.TestCase):
     """Test PDFProcessor main functionality"""
     
-    def setUp(self):
-        self.processor = PDFProcessor()
+    @classmethod
+    def setUpClass(cls):
+        # Tests only read from the processor, so one instance serves the class
+        cls.processor = PDFProcessor()
     
     def test_initialization(self):
         """Test PDFProcessor initializes correctly"""
@@ -294,6 +460,38 @@ class TestPDFProcessor(unittest.TestCase):
         self.assertEqual(herb.sanskrit_name, "अश्वगंधा")
         self.assertIn('vata', herb.doshas)
     
+    def test_properties_read_near_each_herb(self):
+        """Test that properties come from the text around each herb's mentions"""
+        filler = "General notes on preparation and storage.\n" * 30
+        text = ("Ashwagandha balances Vata.\n" + filler +
+                "Brahmi aggravates Kapha.\n")
+        ashwagandha, brahmi = self.processor.extract_herbs_from_text(text)
+        self.assertEqual(ashwagandha.doshas, {'vata': 'pacifies'})
+        self.assertEqual(brahmi.doshas, {'kapha': 'aggravates'})
+    
+    def test_extract_herbs_from_documents(self):
+        """Test parallel extraction matches extracting each document in turn"""
+        documents = [
+            ("a.pdf", "Ashwagandha balances Vata."),
+            ("b.pdf", "Huang Qi tonifies Qi. Enters the Spleen channel."),
+            ("c.pdf", "No herbs here."),
+        ]
+        results = self.processor.extract_herbs_from_documents(documents, max_workers=2)
+        expected = [self.processor.extract_herbs_from_text(text, source)
+                    for source, text in documents]
+        self.assertEqual([[h.to_dict() for h in herbs] for herbs in results],
+                         [[h.to_dict() for h in herbs] for herbs in expected])
+    
+    def test_extracted_herbs_do_not_share_properties(self):
+        """Test that herbs in one document get independent property containers"""
+        text = "Ashwagandha and Brahmi both balance Vata. Rasa: Tikta"
+        first, second = self.processor.extract_herbs_from_text(text)
+        self.assertEqual(first.doshas, second.doshas)
+        first.doshas['kapha'] = 'aggravates'
+        first.rasa.append('Madhura')
+        self.assertNotIn('kapha', second.doshas)
+        self.assertEqual(second.rasa, ['Tikta'])
+    
     def test_extract_herbs_from_text_tcm(self):
         """Test extraction of TCM herbs with properties"""
         text = """
@@ -310,6 +508,28 @@ class TestPDFProcessor(unittest.TestCase):
             self.assertIn('Lung', herb.channels)
             self.assertEqual(herb.tcm_temperature, 'Warm')
     
+    def test_extract_herbs_from_documents_batched(self):
+        """Test results keep input order when documents are batched per worker"""
+        texts = ["Ginseng.", "Ashwagandha balances Vata. " * 20, "Huang Qi enters the Lung channel.",
+                 "Feverfew " * 50, "No herbs here.", "Tulsi and Nettle. " * 5]
+        # 24 documents on 2 workers are sent in batches of 3
+        documents = [(f"{i}.pdf", texts[i % len(texts)] * (i + 1)) for i in range(24)]
+        results = self.processor.extract_herbs_from_documents(documents, max_workers=2)
+        expected = [self.processor.extract_herbs_from_text(text, source)
+                    for source, text in documents]
+        self.assertEqual([[h.to_dict() for h in herbs] for herbs in results],
+                         [[h.to_dict() for h in herbs] for herbs in expected])
+    
+    def test_extract_herbs_by_tradition(self):
+        """Test extraction grouped by tradition"""
+        text = "Feverfew and Nettle. Ashwagandha balances Vata. Huang Qi enters the Lung channel."
+        by_tradition = self.processor.extract_herbs_by_tradition(text, "mixed.pdf")
+        herbs = self.processor.extract_herbs_from_text(text, "mixed.pdf")
+        self.assertEqual(set(by_tradition), {h.tradition for h in herbs})
+        self.assertEqual([h.name for h in by_tradition['western']],
+                         [h.name for h in herbs if h.tradition == 'western'])
+        self.assertEqual([h.name for h in by_tradition['ayurvedic']], ['Ashwagandha'])
+    
     def test_export_to_json(self):
         """Test JSON export functionality"""
         import tempfile
@@ -338,6 +558,16 @@ class TestPDFProcessor(unittest.TestCase):
             if os.path.exists(test_file):
                 os.remove(test_file)
     
+    def test_export_to_json_file_object(self):
+        """Test JSON export to an open text file"""
+        import io
+        herbs = [ExtractedHerb(name="Test Herb", common_names=["Test"])]
+        buffer = io.StringIO()
+        self.processor.export_to_json(herbs, buffer)
+        data = json.loads(buffer.getvalue())
+        self.assertEqual(data[0]['name'], "Test Herb")
+        self.assertEqual(data[0]['common_names'], ["Test"])
+    
     def test_generate_apothecary_code(self):
         """Test Python code generation for apothecary.py"""
         herbs = [
@@ -352,6 +582,12 @@ class TestPDFProcessor(unittest.TestCase):
         self.assertIn("Testus herbicus", code)
         self.assertIn("self._add_substance", code)
     
+    def test_generate_apothecary_code_unique_common_names(self):
+        """Test generated common names list each name once"""
+        herbs = [ExtractedHerb(name="Kutki", common_names=["Katuki", "kutki"])]
+        code = self.processor.generate_apothecary_code(herbs)
+        self.assertIn("common_names=['kutki', 'katuki']", code)
+    
     def test_get_herb_statistics(self):
         """Test statistics gathering"""
         stats = self.processor.get_herb_statistics()
@@ -375,6 +611,14 @@ class TestPatterns(unittest.TestCase):
         self.assertIsNotNone(TCM_PATTERNS)
         self.assertGreater(len(TCM_PATTERNS), 5)
     
+    def test_patterns_match_field_names(self):
+        """Verify each generated pattern has a field name with one capture group"""
+        for patterns, names in ((AYURVEDIC_PATTERNS, AYURVEDIC_FIELDS),
+                                (TCM_PATTERNS, TCM_FIELDS)):
+            self.assertEqual(len(patterns), len(names))
+            for pattern in patterns:
+                self.assertEqual(re.compile(pattern).groups, 1, pattern)
+    
     def test_ayurvedic_dosha_pattern(self):
         """Test Ayurvedic dosha pattern matching"""
         import re
@@ -402,6 +646,7 @@ def run_tests():
     
     # Add all test classes
     suite.addTests(loader.loadTestsFromTestCase(TestHerbDictionaries))
+    suite.addTests(loader.loadTestsFromTestCase(TestHerbLookup))
     suite.addTests(loader.loadTestsFromTestCase(TestExtractedHerbDataclass))
     suite.addTests(loader.loadTestsFromTestCase(TestAyurvedicParser))
     suite.addTests(loader.loadTestsFromTestCase(TestTCMParser))